@@ -1,56 +1,40 @@
 #!/usr/bin/env python3
 """
-Debug notion_client API
+Debug NotionAPI (the thin async REST client)
 """
 
 import sys
 import os
+import asyncio
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def debug_client():
-    """Debug notion_client behavior"""
+async def debug_client():
+    """Debug NotionAPI behavior"""
     from notion_sync.config import get_config
-    from notion_client import Client
-    
+    from notion_sync.notion_client import NotionAPI
+
     config = get_config()
-    if config and config.notion and config.notion.proxy_url:
-        os.environ['HTTP_PROXY'] = config.notion.proxy_url
-        os.environ['HTTPS_PROXY'] = config.notion.proxy_url
-    
-    client = Client(auth=config.notion.token)
-    
-    # Check what client.search actually is
-    print(f"client.search type: {type(client.search)}")
-    print(f"client.search callable: {callable(client.search)}")
-    
-    # Try to call it directly (without await)
-    try:
-        result = client.search(limit=1)
-        print(f"Direct call successful: {type(result)}")
-        print(f"Result has .get: {hasattr(result, 'get')}")
-    except Exception as e:
-        print(f"Direct call failed: {e}")
-        
-    # Check blocks.children.list
-    print(f"\nTesting blocks.children.list...")
-    blocks_endpoint = client.blocks.children
-    print(f"blocks.children.list type: {type(blocks_endpoint.list)}")
-    
-    # Try to call it directly
-    try:
-        # Use a dummy page ID for testing
-        result = blocks_endpoint.list(block_id="test")
-        print(f"blocks.list call type: {type(result)}")
-    except Exception as e:
-        print(f"blocks.list call failed: {e}")
-        
-    # Try with asyncio
-    import asyncio
+    api = NotionAPI(config.notion.token, config.notion.proxy_url)
+
     try:
-        result = asyncio.run(blocks_endpoint.list(block_id="test"))
-        print(f"blocks.list async call type: {type(result)}")
-    except Exception as e2:
-        print(f"blocks.list async call failed: {e2}")
+        # Check search
+        try:
+            result = await api.search(page_size=1)
+            print(f"search call successful: {type(result)}")
+            print(f"Result keys: {list(result.keys())}")
+        except Exception as e:
+            print(f"search call failed: {e}")
+
+        # Check blocks children listing
+        print(f"\nTesting list_children...")
+        try:
+            # Use a dummy page ID for testing
+            result = await api.list_children("test")
+            print(f"list_children call type: {type(result)}")
+        except Exception as e:
+            print(f"list_children call failed: {e}")
+    finally:
+        await api.aclose()
 
 if __name__ == "__main__":
-    debug_client()
\ No newline at end of file
+    asyncio.run(debug_client())
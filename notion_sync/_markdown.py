@@ -0,0 +1,80 @@
+"""
+Notion block 到 Markdown 的转换
+同步时最热的纯文本拼接路径，不依赖其他模块，可以用 mypyc 编译为 C 扩展
+"""
+
+from typing import Any, Callable, Dict, List
+
+
+def _extract_rich_text(rich_text: List[Dict[str, Any]]) -> str:
+    """从富文本中提取纯文本"""
+    parts: List[str] = []
+    for text_item in rich_text:
+        # text 和 annotations 每个片段只取一次
+        text = text_item.get("text") or {}
+        content = text.get("content", "")
+        link = text.get("link")
+        if link:
+            content = f"[{content}]({link['url']})"
+
+        # 处理格式：行内代码放在最内层，否则外层的 ** 等标记会被当作代码原样显示
+        annotations = text_item.get("annotations") or {}
+        if annotations.get("code"):
+            content = f"`{content}`"
+        if annotations.get("bold"):
+            content = f"**{content}**"
+        if annotations.get("italic"):
+            content = f"*{content}*"
+        if annotations.get("strikethrough"):
+            content = f"~~{content}~~"
+
+        parts.append(content)
+
+    return "".join(parts)
+
+
+def _prefixed(prefix: str) -> Callable[[Dict[str, Any]], str]:
+    """标题、列表项等：文本前加固定前缀"""
+    def handler(inner: Dict[str, Any]) -> str:
+        text = _extract_rich_text(inner.get("rich_text", []))
+        return f"{prefix}{text}" if text else ""
+    return handler
+
+
+def _code_block(inner: Dict[str, Any]) -> str:
+    """代码块：带语言标记的围栏代码"""
+    text = _extract_rich_text(inner.get("rich_text", []))
+    language = inner.get("language", "")
+    return f"```{language}\n{text}\n```" if text else ""
+
+
+def _image_block(inner: Dict[str, Any]) -> str:
+    """图片：Notion 上传的文件或外链"""
+    image_url = (inner.get("file") or {}).get("url", "") or \
+                (inner.get("external") or {}).get("url", "")
+    return f"![image]({image_url})" if image_url else ""
+
+
+# block 类型 -> 转换函数，参数是 block[block_type] 这一层的内容
+_BLOCK_HANDLERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "paragraph": _prefixed(""),
+    "heading_1": _prefixed("# "),
+    "heading_2": _prefixed("## "),
+    "heading_3": _prefixed("### "),
+    "bulleted_list_item": _prefixed("- "),
+    "numbered_list_item": _prefixed("1. "),
+    "code": _code_block,
+    "image": _image_block,
+}
+
+
+def block_to_markdown(block: Dict[str, Any]) -> str:
+    """将单个 Notion block 转换为 Markdown"""
+    block_type = block.get("type", "")
+    handler = _BLOCK_HANDLERS.get(block_type)
+    return handler(block.get(block_type) or {}) if handler else ""
+
+
+def blocks_to_markdown(blocks: List[Dict[str, Any]]) -> str:
+    """将页面的全部 block 转换为 Markdown 正文"""
+    return "\n\n".join([block_to_markdown(block) for block in blocks])
@@ -4,18 +4,183 @@ Hugo 内容生成器
 """
 
 import asyncio
+import functools
+import hashlib
 import httpx
+import json
+import mmap
+import os
 import re
+import shutil
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Set, Tuple
+from urllib.parse import urlsplit
 import frontmatter
 from pydantic import BaseModel
 
 from .config import HugoConfig
 from .notion_client import NotionPost, NotionClient, NotionProject
 
+# 优先使用 libyaml 的 C 实现
+try:
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
+
+# orjson 为可选依赖，未安装时使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Markdown 图片语法 ![alt](url)
+_MD_IMG_RE = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+# 已替换为本地路径的图片 ![alt](/images/xxx)
+_LOCAL_IMG_RE = re.compile(r'!\[([^\]]*)\]\(/images/([^)]+)\)')
+# 同上，用于直接扫描 mmap 的字节内容
+_LOCAL_IMG_BYTES_RE = re.compile(_LOCAL_IMG_RE.pattern.encode())
+# URL 中带过期时间的临时路径段（生成哈希 ID 前去掉）
+_EXPIRES_RE = re.compile(r'/[^/]*expires[^/]*')
+# 本地图片文件名中的图片 ID：post_slug-image_id.ext
+_IMAGE_ID_RE = re.compile(r'.*-([0-9a-f]{8})\..*')
+# 需要下载的远程图片地址前缀
+_HTTP_PREFIXES = ("http://", "https://")
+# 清理时识别的图片扩展名
+_IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_notion_image_id(image_url: str) -> str:
+    """从 Notion 图片 URL 中提取稳定的文件 ID"""
+    # Notion 图片 URL 格式通常为：
+    # https://prod-files-secure.s3.us-west-2.amazonaws.com/USER_ID/FILE_ID/IMAGE_ID/file_name?expires=...
+    # 或者
+    # https://file.notion.so/f/FILE_ID/IMAGE_ID/file_name?expires=...
+    try:
+        parts = urlsplit(image_url)
+    except ValueError:
+        # URL 无法解析时，使用完整的 URL 哈希
+        return hashlib.blake2b(image_url.encode(), digest_size=4).hexdigest()
+    
+    segments = parts.path.split("/")
+    
+    # 格式：https://file.notion.so/f/FILE_ID/...
+    if parts.netloc == "file.notion.so" and len(segments) > 2 and segments[1] == "f" and segments[2]:
+        return segments[2][:8]  # 取前8位
+    
+    # 格式：https://s3.amazonaws.com/USER_ID/FILE_ID/...
+    # 只匹配一直以来识别的 s3.amazonaws.com；区域桶（如 s3.us-west-2.amazonaws.com）
+    # 历来使用下面的哈希 ID，改变规则会让已下载的图片全部换名重新下载
+    if "s3.amazonaws.com" in image_url and len(segments) > 2 and len(segments[2]) >= 8:
+        return segments[2][:8]
+    
+    # 无法提取文件 ID 时，用不含查询参数（时间戳和签名）的 URL 生成稳定哈希，
+    # 与之前生成的文件名保持一致
+    stable_url = _EXPIRES_RE.sub('', image_url.split("?")[0])
+    return hashlib.blake2b(stable_url.encode(), digest_size=4).hexdigest()
+
+
+def _read_front_matter(filepath: Path, limit: int = 4096) -> Dict[str, Any]:
+    """只读取文件开头的 YAML 前置数据，不解析正文"""
+    with open(filepath, "rb") as f:
+        head = f.read(limit)
+    if not head.startswith(b"---"):
+        return {}
+    
+    end = head.find(b"\n---", 3)
+    if end == -1:
+        # 前置数据超出读取范围时，退回完整解析
+        with open(filepath, "r", encoding="utf-8") as f:
+            return frontmatter.load(f).metadata
+    
+    return yaml.load(head[3:end].decode("utf-8"), Loader=_YamlLoader) or {}
+
+
+def _scan_post_images(post_file: Path) -> Set[str]:
+    """用 mmap 扫描文章文件，返回其中引用的本地图片文件名"""
+    try:
+        with open(post_file, "rb") as f:
+            # 空文件无法 mmap
+            if os.fstat(f.fileno()).st_size == 0:
+                return set()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return {match.group(2).decode("utf-8") for match in _LOCAL_IMG_BYTES_RE.finditer(mm)}
+    except FileNotFoundError:
+        return set()
+    except Exception as e:
+        print(f"[ERROR] 读取文章 {post_file.name} 失败: {e}")
+        return set()
+
+
+def _front_matter_images(meta: Dict[str, Any]) -> Set[str]:
+    """前置数据中引用的本地封面图片（image/cover），返回相对 images 目录的文件名"""
+    names = set()
+    for key in ("image", "cover"):
+        value = meta.get(key)
+        if isinstance(value, str) and value.startswith("/images/"):
+            names.add(value[len("/images/"):])
+    return names
+
+
+def _referenced_images(filepath: Path) -> Set[str]:
+    """生成文件引用的全部本地图片：正文中的图片和前置数据中的封面"""
+    try:
+        meta = _read_front_matter(filepath)
+    except FileNotFoundError:
+        return set()
+    except Exception as e:
+        print(f"[ERROR] 读取前置数据失败 {filepath.name}: {e}")
+        meta = {}
+    return _front_matter_images(meta) | _scan_post_images(filepath)
+
+
+def _part_path(local_path: Path) -> Path:
+    """下载过程中使用的临时文件路径"""
+    return local_path.with_suffix(local_path.suffix + ".part")
+
+
+def _stream_to_file(chunks: Iterable[bytes], local_path: Path):
+    """分块写入临时 .part 文件，完整写完后再原子替换为目标文件
+    
+    下载中断时不会在目标路径留下被截断的图片。
+    """
+    part = _part_path(local_path)
+    try:
+        with open(part, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(part, local_path)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+
+
+async def _astream_to_file(chunks: AsyncIterator[bytes], local_path: Path):
+    """_stream_to_file 的异步版本"""
+    part = _part_path(local_path)
+    try:
+        # 64 KiB 的写入落在页缓存里，直接同步写，不为每块切换线程
+        with open(part, "wb") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+        os.replace(part, local_path)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+
+
+def _stable_url(image_url: str) -> str:
+    """去掉查询参数（Notion 的签名和过期时间），得到稳定的缓存键"""
+    return image_url.split("?")[0].split("#")[0]
+
+
+def _needs_revalidation(image_url: str) -> bool:
+    """Notion 托管的文件按 ID 寻址，内容不会变化；外链图片需要向源站确认"""
+    return not any(host in image_url for host in ("file.notion.so", "amazonaws.com"))
+
 
 class HugoGenerator:
     """Hugo 内容生成器"""
@@ -29,28 +194,54 @@ class HugoGenerator:
         self.config.images_dir.mkdir(parents=True, exist_ok=True)
         self.static_dir = Path(self.config.static_dir)
         self.images_dir = Path(self.config.images_dir)
+        (self.images_dir / "projects").mkdir(parents=True, exist_ok=True)
+        
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+        # 图片下载共用一个同步客户端，复用连接池，避免每张图片重新握手
+        self._sync_client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+        
+        # 图片下载缓存：稳定 URL -> 本地文件名和 etag/last-modified，跨次同步复用。
+        # 放在 static 目录之外，否则 Hugo 会把它（含源地址和 ETag）发布到 /images/.cache.json；
+        # 文件名按图片目录区分，多个站点互不干扰
+        site_key = hashlib.blake2b(str(self.images_dir.resolve()).encode(), digest_size=4).hexdigest()
+        cache_dir = Path.home() / ".cache" / "notion_sync"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._img_cache_path = cache_dir / f"images-{site_key}.json"
+        self._img_cache = self._load_image_cache()
         
-        self.http_client = httpx.AsyncClient()
+        # 图片 ID -> 本地文件的索引，启动时扫描一次目录
+        self._image_index = self._build_image_index()
+        
+        # 本次运行生成的内容中引用到的图片（相对 images_dir 的文件名）
+        self._emitted_images: set[str] = set()
+        # 本次运行成功写入的内容文件；其余留在磁盘上的文件在清理图片时需要扫描
+        self._written_files: Set[Path] = set()
     
     async def generate_posts(self, posts: List[NotionPost], notion_client: NotionClient) -> int:
         """生成 Hugo 文章"""
-        generated_count = 0
-        
         print(f"开始生成 {len(posts)} 篇文章...")
         
-        for i, post in enumerate(posts, 1):
-            try:
-                print(f"处理第 {i}/{len(posts)} 篇: {post.title}")
-                
-                # 获取文章内容
-                content = notion_client.get_page_content(post.id)
-                
-                # 生成文件
-                self._generate_post_file(post, content)
-                generated_count += 1
-                
-            except Exception as e:
-                print(f"[ERROR] 生成失败 {post.title}: {e}")
+        # 独立项目页面所在目录，只需创建一次
+        (self.config.pages_dir / "projects").mkdir(parents=True, exist_ok=True)
+        
+        # 各篇文章之间互不依赖，限制并发数后同时处理
+        sem = asyncio.Semaphore(6)
+        tasks = [
+            asyncio.create_task(self._process_one(post, i, len(posts), notion_client, sem))
+            for i, post in enumerate(posts, 1)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        generated_count = sum(1 for result in results if result is True)
         
         # TODO: 临时禁用项目集合页面生成，先专注于基本同步
         # self._generate_projects_pages(posts, notion_client)
@@ -60,11 +251,31 @@ class HugoGenerator:
         # self.http_client.aclose()  # 不需要关闭，因为它可能是同步的客户端
         return generated_count
         
+    async def _process_one(self, post: NotionPost, index: int, total: int,
+                           notion_client: NotionClient, sem: asyncio.Semaphore) -> bool:
+        """处理单篇文章，成功返回 True"""
+        async with sem:
+            try:
+                print(f"处理第 {index}/{total} 篇: {post.title}")
+                
+                # 获取文章内容
+                content = await notion_client.get_page_content(
+                    post.id, post.last_edited_time, reuse_cached=self._has_local_images
+                )
+                
+                # 生成文件
+                await self._generate_post_file(post, content)
+                return True
+                
+            except Exception as e:
+                print(f"[ERROR] 生成失败 {post.title}: {e}")
+                return False
+        
     def _download_cover_image(self, image_url: str, post_slug: str) -> str:
         """Download cover image and return relative path"""
         try:
             # Extract image ID for consistent naming
-            image_id = self._extract_notion_image_id(image_url)
+            image_id = _extract_notion_image_id(image_url)
             if not image_id:
                 image_id = str(hash(image_url))
             
@@ -75,35 +286,51 @@ class HugoGenerator:
                 if url_ext in ["jpg", "jpeg", "png", "gif", "webp"]:
                     ext = f".{url_ext}"
             
+            # Reuse a cached download when possible
+            key = _stable_url(image_url)
+            entry = self._cached_image(key)
+            if entry and not _needs_revalidation(image_url):
+                return self._emit_image(entry['filename'])
+            
+            # Skip the download if the same cover (same file ID) is already on disk.
+            # A cached external image falls through to the conditional GET below.
+            if entry is None:
+                existing = self._find_existing_image(image_id)
+                if existing and existing.suffix == ext:
+                    return self._emit_image(existing.name)
+            
             # Download image
             filename = f"{post_slug}-{image_id}{ext}"
             local_path = self.images_dir / filename
             
-            # Use synchronous download
-            import httpx
-            response = httpx.get(image_url, follow_redirects=True, timeout=30)
-            response.raise_for_status()
-            
-            with open(local_path, "wb") as f:
-                for chunk in response.iter_bytes(chunk_size=8192):
-                    f.write(chunk)
+            # Use synchronous download, streamed straight to disk
+            with self._sync_client.stream("GET", image_url, headers=self._conditional_headers(entry)) as response:
+                if entry and response.status_code == 304:
+                    return self._emit_image(entry['filename'])
+                response.raise_for_status()
+                
+                _stream_to_file(response.iter_bytes(chunk_size=65536), local_path)
+            self._image_index[image_id] = local_path
             
-            return f"/images/{filename}"
+            self._remember_image(key, filename, response)
+            return self._emit_image(filename)
         except Exception as e:
             print(f"[ERROR] Failed to download cover image: {e}")
             raise
 
-    def _generate_post_file(self, post: NotionPost, content: str):
+    async def _generate_post_file(self, post: NotionPost, content: str):
         """生成单篇文章"""
         # 处理内容中的图片
-        processed_content = self._process_images(content, post.slug)
+        processed_content, complete = await self._process_images(content, post.slug)
 
         cover_path = None
         if post.cover_url:
             try:
-                cover_path = self._download_cover_image(post.cover_url, post.slug)
+                # 封面下载和写盘都是阻塞操作，放到线程中执行
+                cover_path = await asyncio.to_thread(self._download_cover_image, post.cover_url, post.slug)
             except Exception as e:
                 print(f"[WARNING] Failed to download cover image: {e}")
+                complete = False
         
         # 创建 front matter
         front_matter = {
@@ -119,6 +346,12 @@ class HugoGenerator:
             "type": post.post_type,
         }
         
+        # 有图片下载失败时不记录 last_edited_time，下次增量同步会重新生成
+        if complete:
+            front_matter["last_edited_time"] = post.last_edited_time
+        else:
+            print(f"[WARNING] {post.title} 有图片下载失败，下次同步时重试")
+        
         # 添加项目特定属性
         if post.is_project():
             if post.project_status:
@@ -140,59 +373,151 @@ class HugoGenerator:
         # 创建 post 对象
         post_obj = frontmatter.Post(processed_content, **front_matter)
         
-        # 根据文章类型选择目录和布局
+        # 根据文章类型选择布局
         if post.is_page():
             if post.post_type == "project":
                 # 独立项目页面
                 front_matter["layout"] = "single-project"
-                # 创建 projects 子目录
-                projects_dir = self.config.pages_dir / "projects"
-                projects_dir.mkdir(parents=True, exist_ok=True)
-                filepath = projects_dir / f"{post.slug}.md"
             elif post.post_type == "projects":
                 # 项目集合页面
                 front_matter["layout"] = "projects"
-                filepath = self.config.pages_dir / f"{post.slug}.md"
-            else:
-                # 普通 Page 类型直接放在 content 目录下
-                filepath = self.config.pages_dir / f"{post.slug}.md"
-        else:
-            # Post 类型放在 posts 目录下
-            filepath = self.config.content_dir / f"{post.slug}.md"
+        filepath = self._post_path(post)
         
         # 写入文件
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(frontmatter.dumps(post_obj))
+        await asyncio.to_thread(filepath.write_text, frontmatter.dumps(post_obj, Dumper=_YamlDumper), encoding="utf-8")
+        self._written_files.add(filepath)
         
         print(f"[OK] 生成文章: {filepath.name}")
     
-    def _process_images(self, content: str, post_slug: str) -> str:
-        """处理文章中的图片（简化同步版本）"""
-        # 匹配 Markdown 图片语法
-        image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
+    def _post_path(self, post: NotionPost) -> Path:
+        """文章对应的输出文件路径"""
+        if post.is_page():
+            if post.post_type == "project":
+                # 独立项目页面，projects 子目录已在 generate_posts 中创建
+                return self.config.pages_dir / "projects" / f"{post.slug}.md"
+            # 项目集合页面和普通 Page 类型直接放在 content 目录下
+            return self.config.pages_dir / f"{post.slug}.md"
+        # Post 类型放在 posts 目录下
+        return self.config.content_dir / f"{post.slug}.md"
+    
+    def plan_changes(self, posts: List[NotionPost],
+                     projects: List[NotionProject]) -> Tuple[Set[str], List[Path]]:
+        """对比 Notion 页面和已生成的文件，规划增量同步
         
-        def download_and_replace(match):
-            alt_text = match.group(1)
-            image_url = match.group(2)
+        返回 (需要重新生成的页面 ID, 需要删除的文件)。页面 ID、last_edited_time
+        和输出路径都与磁盘上一致的文件保持不动。
+        """
+        wanted: Dict[Path, NotionPost] = {self._post_path(post): post for post in posts}
+        projects_dir = self.config.pages_dir / "projects"
+        for project in projects:
+            wanted[projects_dir / f"{project.slug}.md"] = project
+        
+        existing_files = [path for path in self._content_files() if path.name != "_index.md"]
+        
+        unchanged: Set[str] = set()
+        to_delete: List[Path] = []
+        for filepath in existing_files:
+            try:
+                meta = _read_front_matter(filepath)
+            except Exception as e:
+                print(f"[ERROR] 处理文件失败 {filepath}: {e}")
+                continue
             
-            # 跳过已经是本地路径的图片
-            if not image_url.startswith(("http://", "https://")):
-                return match.group(0)
+            notion_id = meta.get("notion_id")
+            if not notion_id:
+                # 手写的页面（如 archives.md、search.md）不由同步管理
+                continue
             
+            item = wanted.get(filepath)
+            if item is None:
+                to_delete.append(filepath)
+            elif item.id == notion_id and meta.get("last_edited_time") == item.last_edited_time:
+                unchanged.add(item.id)
+        
+        to_write = {item.id for item in wanted.values()} - unchanged
+        print(f"增量同步: {len(to_write)} 个页面需要更新，{len(unchanged)} 个未变化，{len(to_delete)} 个文件待删除")
+        return to_write, to_delete
+    
+    def _content_files(self) -> List[Path]:
+        """磁盘上所有的内容文件（posts、pages 和 pages/projects 下的 .md）"""
+        files = []
+        for directory in (self.config.content_dir, self.config.pages_dir, self.config.pages_dir / "projects"):
+            if not directory.exists():
+                continue
+            with os.scandir(directory) as entries:
+                files.extend(
+                    Path(entry.path) for entry in entries
+                    if entry.name.endswith(".md") and entry.is_file(follow_symlinks=False)
+                )
+        return files
+    
+    def delete_files(self, files: List[Path]):
+        """删除不再对应 Notion 页面的生成文件"""
+        for filepath in files:
             try:
-                # 从 Notion URL 中提取稳定的文件 ID
-                image_id = self._extract_notion_image_id(image_url)
-                
-                # 检查图片是否已存在（基于文件 ID）
+                filepath.unlink()
+                print(f"[WARNING] 删除旧文件: {filepath.name}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"[ERROR] 删除文件失败 {filepath}: {e}")
+    
+    async def _process_images(self, content: str, post_slug: str) -> Tuple[str, bool]:
+        """处理文章中的图片（同一篇文章的图片并发下载）
+        
+        返回 (替换后的内容, 是否所有图片都下载成功)。
+        """
+        # 收集所有远程图片（相同地址只下载一次），跳过已经是本地路径的图片
+        urls = list(dict.fromkeys(
+            match.group(2) for match in _MD_IMG_RE.finditer(content)
+            if match.group(2).startswith(_HTTP_PREFIXES)
+        ))
+        if not urls:
+            return content, True
+        
+        local_paths = dict(zip(urls, await self._fetch_all(urls, post_slug)))
+        complete = all(local_paths.values())
+        
+        def replace(match):
+            local_path = local_paths.get(match.group(2))
+            if local_path:
+                return f"![{match.group(1)}]({local_path})"
+            return match.group(0)
+        
+        # 一次 re.sub 完成所有替换
+        return _MD_IMG_RE.sub(replace, content), complete
+    
+    async def _fetch_all(self, urls: List[str], post_slug: str) -> List[Optional[str]]:
+        """并发下载图片，返回与 urls 一一对应的本地路径"""
+        # 限制单篇文章的并发下载数
+        sem = asyncio.Semaphore(8)
+        return await asyncio.gather(*[self._fetch_one(url, post_slug, sem) for url in urls])
+    
+    async def _fetch_one(self, image_url: str, post_slug: str, sem: asyncio.Semaphore) -> Optional[str]:
+        """下载单张图片，返回本地路径；失败时返回 None"""
+        try:
+            # 优先使用下载缓存
+            key = _stable_url(image_url)
+            entry = self._cached_image(key)
+            if entry and not _needs_revalidation(image_url):
+                return self._emit_image(entry['filename'])
+            
+            # 从 Notion URL 中提取稳定的文件 ID
+            image_id = _extract_notion_image_id(image_url)
+            
+            # 检查图片是否已存在（基于文件 ID）；
+            # 有缓存条目的外链图片不走这里，而是在下面发送条件请求向源站确认
+            if entry is None:
                 existing_file = self._find_existing_image(image_id)
                 if existing_file:
-                    relative_path = f"/images/{existing_file.name}"
                     print(f"[OK] 使用已存在的图片: {existing_file.name}")
-                    return f"![{alt_text}]({relative_path})"
-                
-                # 使用 httpx 下载图片
-                import httpx
-                response = httpx.get(image_url, timeout=30, follow_redirects=True)
+                    return self._emit_image(existing_file.name)
+            
+            async with sem, self.http_client.stream(
+                "GET", image_url, headers=self._conditional_headers(entry)
+            ) as response:
+                if entry and response.status_code == 304:
+                    return self._emit_image(entry['filename'])
                 response.raise_for_status()
                 
                 # 获取文件扩展名
@@ -212,155 +537,156 @@ class HugoGenerator:
                 filename = f"{post_slug}-{image_id}{ext}"
                 local_path = self.images_dir / filename
                 
-                # 保存图片
-                with open(local_path, "wb") as f:
-                    f.write(response.content)
-                
-                # 返回新的 Markdown 语法
-                relative_path = f"/images/{filename}"
-                return f"![{alt_text}]({relative_path})"
-                
-            except Exception as e:
-                print(f"[WARNING] 下载图片失败 {image_url}: {e}")
-                return match.group(0)
-        
-        # 处理所有图片
-        processed_content = content
-        matches = list(re.finditer(image_pattern, content))
-        
-        # 从后往前替换，避免位置偏移问题
-        for match in reversed(matches):
-            replacement = download_and_replace(match)
-            processed_content = processed_content.replace(match.group(0), replacement, 1)
-        
-        return processed_content
-    
-    def _extract_notion_image_id(self, image_url: str) -> str:
-        """从 Notion 图片 URL 中提取稳定的文件 ID"""
-        import hashlib
-        
-        # Notion 图片 URL 格式通常为：
-        # https://prod-files-secure.s3.us-west-2.amazonaws.com/USER_ID/FILE_ID/IMAGE_ID/file_name?expires=...
-        # 或者
-        # https://file.notion.so/f/FILE_ID/IMAGE_ID/file_name?expires=...
-        
-        try:
-            # 方法1：从 URL 路径中提取文件 ID
-            if "file.notion.so" in image_url:
-                # 格式：https://file.notion.so/f/FILE_ID/...
-                parts = image_url.split("/f/")
-                if len(parts) > 1:
-                    file_id = parts[1].split("/")[0]
-                    return file_id[:8]  # 取前8位
+                # 边下载边写盘，不在内存中缓存整张图片
+                await _astream_to_file(response.aiter_bytes(65536), local_path)
+            self._image_index[image_id] = local_path
             
-            elif "s3.amazonaws.com" in image_url:
-                # 格式：https://prod-files-secure.s3.us-west-2.amazonaws.com/USER_ID/FILE_ID/...
-                # 查找包含 amazonaws.com 的段，然后取后面的第2个段
-                parts = image_url.split("/")
-                try:
-                    # 找到包含 amazonaws.com 的段
-                    for i, part in enumerate(parts):
-                        if "amazonaws.com" in part and i + 2 < len(parts):
-                            file_id = parts[i + 2]  # USER_ID 后面的段是 FILE_ID
-                            if len(file_id) >= 8:
-                                return file_id[:8]
-                except (ValueError, IndexError):
-                    pass
-                
-                # 备用方法：查找可能的文件 ID 模式
-                for part in parts:
-                    # 查找看起来像文件 ID 的段（包含字母数字，长度合适）
-                    if len(part) >= 8 and any(c.isalpha() for c in part) and any(c.isdigit() for c in part):
-                        return part[:8]
-            
-            # 方法2：如果无法提取文件 ID，使用 URL 的稳定部分生成哈希
-            # 移除查询参数（包含时间戳和签名）
-            stable_url = image_url.split("?")[0]
-            # 移除可能的临时路径部分
-            stable_url = re.sub(r'/[^/]*expires[^/]*', '', stable_url)
-            
-            # 生成稳定哈希
-            return hashlib.md5(stable_url.encode()).hexdigest()[:8]
+            self._remember_image(key, filename, response)
+            return self._emit_image(filename)
             
-        except Exception:
-            # 如果所有方法都失败，使用完整的 URL 哈希
-            return hashlib.md5(image_url.encode()).hexdigest()[:8]
-    
-    def _find_existing_image(self, image_id: str) -> Optional[Path]:
-        """查找是否已存在相同 ID 的图片"""
-        if not self.images_dir.exists():
+        except Exception as e:
+            print(f"[WARNING] 下载图片失败 {image_url}: {e}")
             return None
+    
+    def _load_image_cache(self) -> Dict[str, Dict[str, Any]]:
+        """读取图片下载缓存"""
+        # 迁移旧版本写在 static/images 下的缓存，并从发布目录中删除
+        legacy_path = self.images_dir / ".cache.json"
+        if legacy_path.exists():
+            try:
+                if not self._img_cache_path.exists():
+                    # 可能跨文件系统，不能用 os.replace
+                    shutil.move(legacy_path, self._img_cache_path)
+                else:
+                    legacy_path.unlink()
+            except OSError as e:
+                print(f"[WARNING] 迁移旧图片缓存失败: {e}")
         
-        # 查找所有包含该图片 ID 的文件
-        for image_file in self.images_dir.glob(f"*-{image_id}.*"):
-            if image_file.is_file():
-                return image_file
-        
+        if not self._img_cache_path.exists():
+            return {}
+        try:
+            with open(self._img_cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[WARNING] 读取图片缓存失败: {e}")
+            return {}
+    
+    def _save_image_cache(self):
+        """写回图片下载缓存"""
+        try:
+            with open(self._img_cache_path, "w", encoding="utf-8") as f:
+                json.dump(self._img_cache, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"[WARNING] 保存图片缓存失败: {e}")
+    
+    def _cached_image(self, key: str) -> Optional[Dict[str, Any]]:
+        """返回缓存条目（本地文件已不存在时视为未命中）"""
+        entry = self._img_cache.get(key)
+        if entry and (self.images_dir / entry["filename"]).exists():
+            return entry
         return None
     
-    def clean_old_posts(self, current_posts: List[NotionPost]):
-        """清理不再存在的文章"""
-        current_slugs = {post.slug for post in current_posts}
-        
-        # 扫描现有文件
-        existing_files = list(self.config.content_dir.glob("*.md"))
+    def _conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def _remember_image(self, key: str, filename: str, response: httpx.Response):
+        """记录下载结果到缓存"""
+        self._img_cache[key] = {
+            "filename": filename,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+    
+    def _has_local_images(self, content: str, project: bool = False) -> bool:
+        """正文中的 Notion 图片是否都已下载到本地
         
-        for filepath in existing_files:
-            try:
-                # 读取文件获取 slug
-                with open(filepath, "r", encoding="utf-8") as f:
-                    post_obj = frontmatter.load(f)
-                    slug = post_obj.get("slug", "")
-                
-                # 如果文章不在当前列表中，删除文件
-                if slug and slug not in current_slugs:
-                    filepath.unlink()
-                    print(f"[WARNING] 删除旧文章: {filepath.name}")
-                    
-            except Exception as e:
-                print(f"[ERROR] 处理文件失败 {filepath}: {e}")
+        缓存的正文里 Notion 图片地址带有会过期的签名，本地缺少图片时必须重新获取正文，
+        否则只能拿着失效的地址下载。外链图片不会过期，不影响判断。
+        """
+        for match in _MD_IMG_RE.finditer(content):
+            image_url = match.group(2)
+            if not image_url.startswith(_HTTP_PREFIXES) or _needs_revalidation(image_url):
+                continue
+            image_id = _extract_notion_image_id(image_url)
+            if project:
+                # 项目图片按 projects/{image_id}.jpg 存放
+                found = (self.images_dir / "projects" / f"{image_id}.jpg").exists()
+            else:
+                found = self._cached_image(_stable_url(image_url)) or self._find_existing_image(image_id)
+            if not found:
+                return False
+        return True
+    
+    def _emit_image(self, filename: str) -> str:
+        """记录被引用的图片，并返回其站点路径"""
+        self._emitted_images.add(filename)
+        return f"/images/{filename}"
+    
+    def _build_image_index(self) -> Dict[str, Path]:
+        """扫描图片目录，建立 图片 ID -> 文件 的索引"""
+        index = {}
+        with os.scandir(self.images_dir) as entries:
+            for entry in entries:
+                # 跳过中断下载留下的 .part 临时文件
+                if entry.name.endswith(".part"):
+                    continue
+                match = _IMAGE_ID_RE.match(entry.name)
+                if match and entry.is_file(follow_symlinks=False):
+                    index[match.group(1)] = Path(entry.path)
+        return index
+    
+    def _find_existing_image(self, image_id: str) -> Optional[Path]:
+        """查找是否已存在相同 ID 的图片"""
+        return self._image_index.get(image_id)
     
-    def clean_unused_images(self, current_posts: List[NotionPost]):
+    def clean_unused_images(self):
         """清理无用的图片文件"""
         if not self.images_dir.exists():
             return
         
-        # 获取所有当前文章中使用的图片
-        used_images = set()
-        for post in current_posts:
-            try:
-                # 读取文章内容
-                post_file = self.config.content_dir / f"{post.slug}.md"
-                if post_file.exists():
-                    with open(post_file, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        # 提取图片路径
-                        import re
-                        image_matches = re.findall(r'!\[([^\]]*)\]\(/images/([^)]+)\)', content)
-                        used_images.update(image_matches)
-            except Exception as e:
-                print(f"[ERROR] 读取文章 {post.slug} 失败: {e}")
+        # 本次写入的文件直接使用生成时记录的图片；其余仍在磁盘上的内容文件
+        # （未变化的、重新生成失败的、无法解析的、手写的）并行扫描正文和前置数据
+        used_images = set(self._emitted_images)
+        kept_files = [path for path in self._content_files() if path not in self._written_files]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for names in executor.map(_referenced_images, kept_files):
+                used_images |= names
         
-        # 扫描所有图片文件
-        all_images = set()
-        for image_file in self.images_dir.glob("*.*"):
-            if image_file.is_file() and image_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                all_images.add(image_file.name)
+        # 扫描图片目录，同时找出未被引用的图片
+        with os.scandir(self.images_dir) as entries:
+            unused_images = []
+            for entry in entries:
+                _, dot, ext = entry.name.rpartition(".")
+                # 中断下载留下的 .part 临时文件一并清理
+                if (dot and (ext.lower() in _IMAGE_EXTENSIONS or ext == "part")
+                        and entry.name not in used_images
+                        and entry.is_file(follow_symlinks=False)):
+                    unused_images.append(entry.name)
         
-        # 删除未使用的图片
-        unused_images = all_images - used_images
-        for image_name in unused_images:
-            try:
-                (self.images_dir / image_name).unlink()
-                print(f"[OK] 删除无用图片: {image_name}")
-            except Exception as e:
-                print(f"[ERROR] 删除图片失败 {image_name}: {e}")
+        # 并行删除未使用的图片
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self._unlink_image, unused_images))
         
         if unused_images:
             print(f"[OK] 清理完成，删除了 {len(unused_images)} 个无用图片")
         else:
             print("[OK] 没有无用图片需要清理")
     
+    def _unlink_image(self, image_name: str):
+        """删除单个图片文件"""
+        try:
+            (self.images_dir / image_name).unlink()
+            print(f"[OK] 删除无用图片: {image_name}")
+        except Exception as e:
+            print(f"[ERROR] 删除图片失败 {image_name}: {e}")
+    
     async def _generate_projects_pages(self, posts: List[NotionPost], notion_client: NotionClient):
         """生成项目相关页面"""
         # 找到项目集合页面
@@ -370,12 +696,12 @@ class HugoGenerator:
             print(f"处理项目集合页面: {projects_page.title}")
             
             # 获取页面内容
-            content = notion_client.get_page_content(projects_page.id)
+            content = await notion_client.get_page_content(projects_page.id, projects_page.last_edited_time)
             
             # 如果页面有关联的数据库，从数据库获取项目
             if projects_page.database_id:
                 print(f"从数据库获取项目数据...")
-                project_posts = notion_client.get_database_pages(projects_page.database_id)
+                project_posts = await notion_client.get_database_pages(projects_page.database_id)
                 
                 # 生成项目数据
                 projects_data = []
@@ -394,50 +720,38 @@ class HugoGenerator:
                     }
                     projects_data.append(project_data)
                 
-                # 在内容中注入项目数据
-                projects_yaml = f"projects:\n"
-                for i, project in enumerate(projects_data):
-                    projects_yaml += f"  - title: {project['title']}\n"
-                    if project['description']:
-                        projects_yaml += f"    description: \"{project['description']}\"\n"
-                    if project['status']:
-                        projects_yaml += f"    status: {project['status']}\n"
-                    if project['technologies']:
-                        projects_yaml += f"    technologies: [{', '.join(project['technologies'])}]\n"
-                    if project['period']:
-                        projects_yaml += f"    period: {project['period']}\n"
-                    if project['category']:
-                        projects_yaml += f"    category: {project['category']}\n"
-                    if project['github']:
-                        projects_yaml += f"    github: {project['github']}\n"
-                    if project['demo']:
-                        projects_yaml += f"    demo: {project['demo']}\n"
-                    if project['cover']:
-                        projects_yaml += f"    cover: {project['cover']}\n"
-                    if project['slug']:
-                        projects_yaml += f"    slug: {project['slug']}\n"
-                    if i < len(projects_data) - 1:
-                        projects_yaml += "\n"
-                
-                # 在页面内容前添加 YAML 前置数据
-                full_content = f"---\ntitle: \"{projects_page.title}\"\ntype: \"projects\"\ndescription: \"{projects_page.description}\"\n{projects_yaml}\n---\n\n{content}"
+                # 在页面内容前添加 YAML 前置数据（跳过空字段）
+                page_front_matter = {
+                    "title": projects_page.title,
+                    "type": "projects",
+                    "description": projects_page.description,
+                    "projects": [
+                        {key: value for key, value in project.items() if value}
+                        for project in projects_data
+                    ],
+                }
+                projects_yaml = yaml.dump(
+                    page_front_matter, Dumper=_YamlDumper, allow_unicode=True, sort_keys=False
+                )
+                full_content = f"---\n{projects_yaml}---\n\n{content}"
                 
             else:
                 # 没有关联数据库，使用普通页面处理
                 full_content = content
             
             # 生成文件
-            self._generate_projects_page_file(projects_page, full_content)
+            await self._generate_projects_page_file(projects_page, full_content)
     
-    def _generate_projects_page_file(self, post: NotionPost, content: str):
+    async def _generate_projects_page_file(self, post: NotionPost, content: str):
         """生成项目集合页面文件"""
         # 处理内容中的图片
-        processed_content = self._process_images(content, post.slug)
+        processed_content, _ = await self._process_images(content, post.slug)
 
         cover_path = None
         if post.cover_url:
             try:
-                cover_path = self._download_cover_image(post.cover_url, post.slug)
+                # 封面下载和写盘都是阻塞操作，放到线程中执行
+                cover_path = await asyncio.to_thread(self._download_cover_image, post.cover_url, post.slug)
             except Exception as e:
                 print(f"[WARNING] Failed to download cover image: {e}")
         
@@ -467,8 +781,7 @@ class HugoGenerator:
         filepath = self.config.pages_dir / f"{post.slug}.md"
         
         # 写入文件
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(frontmatter.dumps(post_obj))
+        await asyncio.to_thread(filepath.write_text, frontmatter.dumps(post_obj, Dumper=_YamlDumper), encoding="utf-8")
         
         print(f"[OK] 生成项目集合页面: {filepath.name}")
     
@@ -488,10 +801,12 @@ title: "我的博客"
         with open(index_path, "w", encoding="utf-8") as f:
             f.write(index_content)
     
-    async def generate_projects(self, projects: List[NotionProject], notion_client: NotionClient) -> int:
-        """生成 Hugo 项目页面"""
-        generated_count = 0
+    async def generate_projects(self, projects: List[NotionProject], notion_client: NotionClient,
+                                changed: Optional[Set[str]] = None) -> int:
+        """生成 Hugo 项目页面
         
+        集合页和数据文件总是根据全部项目生成；传入 changed 时只重新生成其中的项目详情页。
+        """
         print(f"开始生成 {len(projects)} 个项目...")
         
         # 创建项目目录
@@ -499,31 +814,49 @@ title: "我的博客"
         projects_dir.mkdir(parents=True, exist_ok=True)
         
         # 生成项目集合页
-        self._generate_projects_collection_page(projects)
+        await self._generate_projects_collection_page(projects)
+        
+        # 并发生成各个项目详情页
+        pending = projects if changed is None else [p for p in projects if p.id in changed]
+        sem = asyncio.Semaphore(6)
+        tasks = [
+            asyncio.create_task(
+                self._process_project(project, i, len(pending), notion_client, projects_dir, sem)
+            )
+            for i, project in enumerate(pending, 1)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        generated_count = sum(1 for result in results if result is True)
         
-        # 生成各个项目详情页
-        for i, project in enumerate(projects, 1):
+        # 生成项目数据文件
+        await self._generate_projects_data(projects)
+        
+        print(f"[OK] 生成了 {generated_count} 个项目页面")
+        return generated_count
+    
+    async def _process_project(self, project: NotionProject, index: int, total: int,
+                               notion_client: NotionClient, projects_dir: Path,
+                               sem: asyncio.Semaphore) -> bool:
+        """处理单个项目，成功返回 True"""
+        async with sem:
             try:
-                print(f"处理第 {i}/{len(projects)} 个项目: {project.title}")
+                print(f"处理第 {index}/{total} 个项目: {project.title}")
                 
                 # 获取项目内容（如果有）
-                content = notion_client.get_page_content(project.id)
+                content = await notion_client.get_page_content(
+                    project.id, project.last_edited_time,
+                    reuse_cached=functools.partial(self._has_local_images, project=True),
+                )
                 
                 # 生成项目文件
-                self._generate_project_file(project, content, projects_dir)
-                generated_count += 1
+                await self._generate_project_file(project, content, projects_dir)
+                return True
                 
             except Exception as e:
                 print(f"生成项目 {project.title} 失败: {e}")
-                continue
-        
-        # 生成项目数据文件
-        self._generate_projects_data(projects)
-        
-        print(f"[OK] 生成了 {generated_count} 个项目页面")
-        return generated_count
+                return False
     
-    def _generate_projects_collection_page(self, projects: List[NotionProject]):
+    async def _generate_projects_collection_page(self, projects: List[NotionProject]):
         """生成项目集合页面"""
         frontmatter = {
             "title": "项目展示",
@@ -565,15 +898,18 @@ title: "我的博客"
         
         # 写入文件
         # Use _index.md in projects directory to act as section index
+        # projects 目录已在 generate_projects 中创建
         filepath = self.config.pages_dir / "projects" / "_index.md"
-        filepath.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"---\n{yaml.dump(frontmatter, allow_unicode=True, default_flow_style=False)}---\n\n{content}")
+        await asyncio.to_thread(
+            filepath.write_text,
+            f"---\n{yaml.dump(frontmatter, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False)}---\n\n{content}",
+            encoding="utf-8",
+        )
         
         print(f"[OK] 生成项目集合页面: {filepath.name}")
     
-    def _generate_project_file(self, project: NotionProject, content: str, projects_dir: Path):
+    async def _generate_project_file(self, project: NotionProject, content: str, projects_dir: Path):
         """生成单个项目文件"""
         frontmatter = {
             "title": project.title,
@@ -586,8 +922,10 @@ title: "我的博客"
             "slug": project.slug,
             "layout": "single-project", # Use custom layout
             "category": project.category,
-            "date": project.date
+            "date": project.date,
+            "notion_id": project.id,
         }
+        complete = True
         
         # 添加可选字段
         if project.github_url:
@@ -598,18 +936,32 @@ title: "我的博客"
             frontmatter["period"] = project.period
         if project.cover_url:
             # 下载封面图片
-            local_cover = self._download_project_cover(project.cover_url, project.slug)
+            local_cover = await asyncio.to_thread(self._download_project_cover, project.cover_url, project.slug)
             if local_cover:
                 frontmatter["cover"] = local_cover
                 frontmatter["image"] = local_cover  # For SEO/OpenGraph
+            else:
+                complete = False
         
         # 处理内容中的图片
-        processed_content = self._process_project_images(content, project.slug)
+        processed_content, images_ok = await asyncio.to_thread(
+            self._process_project_images, content, project.slug
+        )
+        
+        # 有图片下载失败时不记录 last_edited_time，下次增量同步会重新生成
+        if complete and images_ok:
+            frontmatter["last_edited_time"] = project.last_edited_time
+        else:
+            print(f"[WARNING] {project.title} 有图片下载失败，下次同步时重试")
         
         # 写入文件
         filepath = projects_dir / f"{project.slug}.md"
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"---\n{yaml.dump(frontmatter, allow_unicode=True, default_flow_style=False)}---\n\n{processed_content}")
+        await asyncio.to_thread(
+            filepath.write_text,
+            f"---\n{yaml.dump(frontmatter, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False)}---\n\n{processed_content}",
+            encoding="utf-8",
+        )
+        self._written_files.add(filepath)
         
         print(f"[OK] 生成项目文件: {filepath.name}")
     
@@ -620,35 +972,37 @@ title: "我的博客"
             
         try:
             # 生成文件名
-            image_id = self._extract_notion_image_id(image_url)
+            image_id = _extract_notion_image_id(image_url)
             if not image_id:
                 image_id = f"{project_slug}-cover"
                 
             ext = "jpg"  # 默认扩展名
             filename = f"{image_id}.{ext}"
             filepath = self.images_dir / "projects" / filename
-            filepath.parent.mkdir(parents=True, exist_ok=True)
             
-            # 下载图片
-            # Use sync httpx.get instead of async client
-            response = httpx.get(image_url, follow_redirects=True)
-            if response.status_code == 200:
-                with open(filepath, "wb") as f:
-                    f.write(response.content)
-                return f"/images/projects/{filename}"
-            else:
-                print(f"下载封面图片失败: {response.status_code}")
-                return None
+            # 相同文件 ID 的封面已存在时直接复用
+            if filepath.exists():
+                return self._emit_image(f"projects/{filename}")
+            
+            # 下载图片，流式写入磁盘
+            with self._sync_client.stream("GET", image_url) as response:
+                if response.status_code != 200:
+                    print(f"下载封面图片失败: {response.status_code}")
+                    return None
+                _stream_to_file(response.iter_bytes(65536), filepath)
+            return self._emit_image(f"projects/{filename}")
                 
         except Exception as e:
             print(f"下载封面图片时出错: {e}")
             return None
     
-    def _process_project_images(self, content: str, project_slug: str) -> str:
-        """处理项目内容中的图片"""
+    def _process_project_images(self, content: str, project_slug: str) -> Tuple[str, bool]:
+        """处理项目内容中的图片，返回 (替换后的内容, 是否所有图片都下载成功)"""
         if not content:
-            return ""
-            
+            return "", True
+        
+        failed = []
+        
         def download_and_replace(match):
             alt_text = match.group(1)
             image_url = match.group(2)
@@ -656,7 +1010,7 @@ title: "我的博客"
                 return match.group(0)
             
             # 仅仅检查是否为 HTTP(S) 链接
-            if not image_url.startswith(("http://", "https://")):
+            if not image_url.startswith(_HTTP_PREFIXES):
                 return match.group(0)
             
             # 下载图片
@@ -664,47 +1018,42 @@ title: "我的博客"
             if local_path:
                 return f"![{alt_text}]({local_path})"
             else:
+                failed.append(image_url)
                 return match.group(0)
         
         # 处理所有图片
-        content = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', download_and_replace, content)
-        return content
+        content = _MD_IMG_RE.sub(download_and_replace, content)
+        return content, not failed
     
     def _download_project_image(self, image_url: str, project_slug: str) -> Optional[str]:
         """下载项目内容中的图片"""
         try:
-            image_id = self._extract_notion_image_id(image_url)
+            image_id = _extract_notion_image_id(image_url)
             if not image_id:
                 # 使用 hashlib 生成稳定 ID
-                import hashlib
-                image_id = f"{project_slug}-{hashlib.md5(image_url.encode()).hexdigest()[:8]}"
+                image_id = f"{project_slug}-{hashlib.blake2b(image_url.encode(), digest_size=4).hexdigest()}"
                 
             ext = "jpg"
             filename = f"{image_id}.{ext}"
             filepath = self.images_dir / "projects" / filename
-            filepath.parent.mkdir(parents=True, exist_ok=True)
             
             # 如果文件已存在，直接返回
             if filepath.exists():
-                return f"/images/projects/{filename}"
+                return self._emit_image(f"projects/{filename}")
             
-            # Use sync httpx.get instead of async client
-            import httpx
-            response = httpx.get(image_url, follow_redirects=True)
-            if response.status_code == 200:
-                with open(filepath, "wb") as f:
-                    f.write(response.content)
-                return f"/images/projects/{filename}"
-            return None
+            # 流式写入磁盘
+            with self._sync_client.stream("GET", image_url) as response:
+                if response.status_code != 200:
+                    return None
+                _stream_to_file(response.iter_bytes(65536), filepath)
+            return self._emit_image(f"projects/{filename}")
             
         except Exception as e:
             print(f"下载项目图片时出错: {e}")
             return None
     
-    def _generate_projects_data(self, projects: List[NotionProject]):
+    async def _generate_projects_data(self, projects: List[NotionProject]):
         """生成项目数据文件（JSON格式）"""
-        import json
-        
         # 创建数据目录
         data_dir = self.config.content_dir.parent / "data"
         data_dir.mkdir(parents=True, exist_ok=True)
@@ -714,26 +1063,22 @@ title: "我的博客"
         
         # 写入 JSON 文件
         filepath = data_dir / "projects.json"
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(projects_data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            await asyncio.to_thread(
+                filepath.write_bytes,
+                orjson.dumps(projects_data, option=orjson.OPT_INDENT_2),
+            )
+        else:
+            await asyncio.to_thread(
+                filepath.write_text,
+                json.dumps(projects_data, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
         
         print(f"[OK] 生成项目数据文件: {filepath.name}")
     
-    def clean_old_projects(self, current_projects: List[NotionProject]):
-        """清理旧的项目文件"""
-        projects_dir = self.config.content_dir / "projects"
-        if not projects_dir.exists():
-            return
-        
-        current_slugs = {project.slug for project in current_projects}
-        
-        # 删除不再存在的项目文件
-        for filepath in projects_dir.glob("*.md"):
-            slug = filepath.stem
-            if slug not in current_slugs:
-                filepath.unlink()
-                print(f"删除旧项目文件: {filepath.name}")
-    
     async def close(self):
         """关闭 HTTP 客户端"""
         await self.http_client.aclose()
+        self._sync_client.close()
+        self._save_image_cache()
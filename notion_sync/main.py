@@ -5,6 +5,7 @@
 
 import asyncio
 import sys
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List
@@ -29,38 +30,39 @@ class BlogSyncer:
         self.notion_client = NotionClient(self.config.notion)
         self.hugo_generator = HugoGenerator(self.config.hugo)
     
-    def _clean_gen_dirs(self):
-        """清理生成目录"""
-        # 清理 posts 目录
-        posts_dir = self.config.hugo.content_dir
-        if posts_dir.exists():
-            print(f"清理旧目录: {posts_dir}")
-            shutil.rmtree(posts_dir)
-        posts_dir.mkdir(parents=True, exist_ok=True)
-            
-        # 清理 content/data 目录 (注意不是根目录的 data)
-        data_dir = self.config.hugo.content_dir.parent / "data"
-        if data_dir.exists():
-            print(f"清理旧目录: {data_dir}")
-            shutil.rmtree(data_dir)
-        data_dir.mkdir(parents=True, exist_ok=True)
-
-        project_dir = self.config.hugo.content_dir.parent / "projects"
-        if project_dir.exists():
-            print(f"清理旧目录: {project_dir}")
-            shutil.rmtree(project_dir)
-        project_dir.mkdir(parents=True, exist_ok=True)
+    async def _clean_gen_dirs(self):
+        """清理生成目录（posts、content/data 和 projects）"""
+        dirs = [
+            self.config.hugo.content_dir,
+            # 注意不是根目录的 data
+            self.config.hugo.content_dir.parent / "data",
+            self.config.hugo.content_dir.parent / "projects",
+        ]
+        # rmtree 会阻塞事件循环，多个目录在线程中并行删除
+        await asyncio.gather(*(asyncio.to_thread(self._reset_dir, d) for d in dirs))
+    
+    @staticmethod
+    def _reset_dir(directory: Path):
+        """删除目录后重新创建为空目录"""
+        if directory.exists():
+            print(f"清理旧目录: {directory}")
+            shutil.rmtree(directory)
+        directory.mkdir(parents=True, exist_ok=True)
 
     async def sync(self, force: bool = False) -> bool:
         """执行同步操作"""
+        clean_task = None
         try:
             print("开始同步 Notion 到 Hugo...")
             
-            # 清理目录
-            self._clean_gen_dirs()
+            # 强制同步时清空生成目录，否则按 last_edited_time 增量更新
+            # 清理在后台进行，与下面的 Notion 请求重叠
+            clean_task = asyncio.create_task(self._clean_gen_dirs()) if force else None
             
-            # 从 Notion 获取所有文章
-            all_pages = self.notion_client.get_posts()
+            # 从 Notion 一次获取所有页面，再在本地区分文章和项目
+            raw_pages = await self.notion_client.fetch_all_pages()
+            all_pages = self.notion_client.parse_posts(raw_pages)
+            print(f"找到 {len(all_pages)} 篇文章")
             # 过滤掉项目页面，只保留文章和普通页面
             # Debug: Print filtered items
             filtered_projects = [p for p in all_pages if p.is_project() or p.is_projects_page()]
@@ -72,8 +74,9 @@ class BlogSyncer:
             if not posts:
                 print("[OK] 没有找到文章")
             
-            # 从 Notion 获取所有项目
-            projects = self.notion_client.get_projects()
+            # 项目复用同一批已解析的页面，不再重复请求和解析
+            projects = self.notion_client.projects_from_posts(all_pages)
+            print(f"找到 {len(projects)} 个项目")
             
             if not projects:
                 print("[OK] 没有找到项目")
@@ -84,23 +87,31 @@ class BlogSyncer:
             if projects:
                 self._show_projects_summary(projects)
             
+            # 生成前确保目录已清理完毕；取出任务后 finally 不再重复等待
+            if clean_task is not None:
+                task, clean_task = clean_task, None
+                await task
+            
+            # 对比已生成的文件，只更新有变化的页面，删除已不存在的页面
+            to_write, to_delete = self.hugo_generator.plan_changes(posts, projects)
+            self.hugo_generator.delete_files(to_delete)
+            
             # 处理文章
-            if posts:
-                # 清理旧文章
-                self.hugo_generator.clean_old_posts(posts)
-                
+            changed_posts = [p for p in posts if p.id in to_write]
+            if changed_posts:
                 # 生成 Hugo 文章
-                posts_generated = await self.hugo_generator.generate_posts(posts, self.notion_client)
+                posts_generated = await self.hugo_generator.generate_posts(changed_posts, self.notion_client)
                 print(f"[OK] 生成了 {posts_generated} 篇文章")
+            elif posts:
+                print("[OK] 文章没有变化")
             
             # 处理项目
             if projects:
                 try:
-                    # 清理旧项目
-                    self.hugo_generator.clean_old_projects(projects)
-                    
                     # 生成项目页面
-                    projects_generated = await self.hugo_generator.generate_projects(projects, self.notion_client)
+                    projects_generated = await self.hugo_generator.generate_projects(
+                        projects, self.notion_client, changed=to_write
+                    )
                     print(f"[OK] 生成了 {projects_generated} 个项目页面")
                 except Exception as e:
                     print(f"[ERROR] 处理项目时出错: {e}")
@@ -115,58 +126,72 @@ class BlogSyncer:
             traceback.print_exc()
             print(f"[ERROR] 同步失败: {e}")
             return False
+        
+        finally:
+            # 获取页面等步骤提前出错时，后台清理还没被等待过：
+            # 等它结束（线程中的 rmtree 无法取消），并取回其异常，避免异常丢失
+            if clean_task is not None:
+                try:
+                    await clean_task
+                except Exception as e:
+                    print(f"[ERROR] 清理生成目录失败: {e}")
     
     def _show_sync_summary(self, posts):
         """显示同步概览"""
-        published_count = sum(1 for post in posts if post.is_published())
-        draft_count = len(posts) - published_count
-        
-        print(f"同步概览:")
-        print(f"  发布文章: {published_count} 篇")
-        print(f"  草稿文章: {draft_count} 篇")
-        print(f"  总计: {len(posts)} 篇")
-        
-        # 显示文章列表
-        if len(posts) <= 10:
+        # 只显示少量文章时，统计和建表在同一遍遍历中完成
+        show_table = len(posts) <= 10
+        if show_table:
             posts_table = Table(title="文章列表")
             posts_table.add_column("标题", style="cyan")
             posts_table.add_column("状态", style="green")
             posts_table.add_column("标签", style="yellow")
-            
-            for post in posts:
-                status = "发布" if post.is_published() else "草稿"
+        
+        statuses = Counter()
+        for post in posts:
+            status = "发布" if post.is_published() else "草稿"
+            statuses[status] += 1
+            if show_table:
                 tags = ", ".join(post.tags) if post.tags else "无"
                 posts_table.add_row(post.title, status, tags)
-            
+        
+        print(f"同步概览:")
+        print(f"  发布文章: {statuses['发布']} 篇")
+        print(f"  草稿文章: {statuses['草稿']} 篇")
+        print(f"  总计: {len(posts)} 篇")
+        
+        # 显示文章列表
+        if show_table:
             self.console.print(posts_table)
     
     def _show_projects_summary(self, projects):
         """显示项目同步概览"""
-        active_count = sum(1 for project in projects if project.is_active())
-        inactive_count = len(projects) - active_count
-        
-        print(f"项目同步概览:")
-        print(f"  活跃项目: {active_count} 个")
-        print(f"  非活跃项目: {inactive_count} 个")
-        print(f"  总计: {len(projects)} 个")
-        
-        # 显示项目列表
-        if len(projects) <= 10:
+        show_table = len(projects) <= 10
+        if show_table:
             projects_table = Table(title="项目列表")
             projects_table.add_column("标题", style="cyan")
             projects_table.add_column("状态", style="green")
             projects_table.add_column("分类", style="yellow")
             projects_table.add_column("技术栈", style="blue")
-            
-            for project in projects:
-                status = "活跃" if project.is_active() else "非活跃"
+        
+        statuses = Counter()
+        for project in projects:
+            status = "活跃" if project.is_active() else "非活跃"
+            statuses[status] += 1
+            if show_table:
                 category = project.category or "未分类"
                 technologies = ", ".join(project.technologies[:3])  # 只显示前3个
                 if len(project.technologies) > 3:
                     technologies += f" (+{len(project.technologies) - 3})"
                 
                 projects_table.add_row(project.title, status, category, technologies)
-            
+        
+        print(f"项目同步概览:")
+        print(f"  活跃项目: {statuses['活跃']} 个")
+        print(f"  非活跃项目: {statuses['非活跃']} 个")
+        print(f"  总计: {len(projects)} 个")
+        
+        # 显示项目列表
+        if show_table:
             self.console.print(projects_table)
 
 
@@ -180,19 +205,24 @@ def cli():
     
     @main.command()
     @click.option("--clean", is_flag=True, help="清理无用的图片文件")
-    def sync(clean):
+    @click.option("--force", is_flag=True, help="清空生成目录后全量同步")
+    def sync(clean, force):
         """同步 Notion 内容到 Hugo"""
         syncer = BlogSyncer()
         
         async def run_sync():
-            success = await syncer.sync()
-            
-            # 如果指定了清理选项，清理无用图片
-            if success and clean:
-                print("\n开始清理无用图片...")
-                # 需要重新获取文章列表来进行清理
-                posts = syncer.notion_client.get_posts()
-                syncer.hugo_generator.clean_unused_images(posts)
+            try:
+                success = await syncer.sync(force=force)
+                
+                # 如果指定了清理选项，清理无用图片
+                if success and clean:
+                    print("\n开始清理无用图片...")
+                    # 按磁盘上的内容文件判断图片是否在用，无需再请求 Notion
+                    syncer.hugo_generator.clean_unused_images()
+            finally:
+                # 关闭 HTTP 客户端并写回图片缓存
+                await syncer.notion_client.aclose()
+                await syncer.hugo_generator.close()
             
             sys.exit(0 if success else 1)
         
@@ -4,12 +4,110 @@ Notion API 客户端
 """
 
 import asyncio
+import os
+import re
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from notion_client import Client
+from functools import cached_property, partial
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional
 import httpx
 
 from .config import NotionConfig
+from ._markdown import blocks_to_markdown
+
+# orjson 为可选依赖，未安装时使用 httpx 自带的 JSON 解析
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 从标题生成 slug：去掉标点，空白和连字符合并为单个连字符
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+
+
+def _span_text(item: Dict[str, Any]) -> str:
+    """单个富文本片段的纯文本；mention、equation 等片段没有 text，使用 plain_text"""
+    text = item.get("text")
+    if text:
+        return text.get("content", "")
+    return item.get("plain_text", "")
+
+
+def _rt_join(rich_text: List[Dict[str, Any]]) -> str:
+    """合并富文本片段的纯文本；属性值通常只有一个片段，单独走快速路径"""
+    if not rich_text:
+        return ""
+    if len(rich_text) == 1:
+        return _span_text(rich_text[0])
+    return "".join([_span_text(item) for item in rich_text])
+
+
+def _title_text(prop: Dict[str, Any]) -> Optional[str]:
+    """title 类型：合并所有文本片段"""
+    if prop.get("type") != "title":
+        return None
+    return _rt_join(prop.get("title"))
+
+
+def _plain_rich_text(prop: Dict[str, Any]) -> Optional[str]:
+    """rich_text 类型：合并所有文本片段"""
+    if prop.get("type") != "rich_text":
+        return None
+    return _rt_join(prop.get("rich_text"))
+
+
+def _multi_select_names(prop: Dict[str, Any]) -> Optional[List[str]]:
+    """multi_select 类型：选项名称列表"""
+    if prop.get("type") != "multi_select":
+        return None
+    return [option["name"] for option in prop.get("multi_select") or []]
+
+
+def _select_name(prop: Dict[str, Any]) -> Optional[str]:
+    """select 类型：选项名称，未选择时返回 None"""
+    if prop.get("type") != "select" or not prop.get("select"):
+        return None
+    return prop["select"].get("name")
+
+
+def _date_start(prop: Dict[str, Any]) -> Optional[str]:
+    """date 类型：开始日期"""
+    if prop.get("type") != "date" or not prop.get("date"):
+        return None
+    return prop["date"]["start"]
+
+
+def _url_value(prop: Dict[str, Any]) -> Optional[str]:
+    """url 类型"""
+    if prop.get("type") != "url":
+        return None
+    return prop.get("url")
+
+
+# 属性名（小写）-> (字段名, 提取函数, 优先级)
+# 多个属性名对应同一字段时，优先级数字小的生效（如 Tag 优先于 Tags）
+_PROPERTY_EXTRACTORS = {
+    "title": ("title", _title_text, 0),
+    "slug": ("slug", _plain_rich_text, 0),
+    "tag": ("tags", _multi_select_names, 0),
+    "tags": ("tags", _multi_select_names, 1),
+    "status": ("status", _select_name, 0),
+    "date": ("_date", _date_start, 0),
+    "excerpt": ("excerpt", _plain_rich_text, 0),
+    "description": ("_description", _plain_rich_text, 0),
+    "type": ("post_type", _select_name, 0),
+    "project status": ("project_status", _select_name, 0),
+    "project_status": ("project_status", _select_name, 1),
+    "technologies": ("technologies", _multi_select_names, 0),
+    "period": ("project_period", _plain_rich_text, 0),
+    "url": ("github_url", _url_value, 0),
+    "github": ("github_url", _url_value, 1),
+    "demo": ("demo_url", _url_value, 0),
+    "category": ("project_category", _select_name, 0),
+    "projecttype": ("project_type_name", _select_name, 0),
+    "project_type": ("project_type_name", _select_name, 1),
+}
 
 
 class NotionPost:
@@ -28,101 +126,52 @@ class NotionPost:
         self.created_time = page_data.get("created_time", "")
         self.last_edited_time = page_data.get("last_edited_time", "")
         
-    @property
-    def title(self) -> str:
-        """获取标题"""
-        title_prop = self.properties.get("Title", self.properties.get("title", {}))
-        
-        # 安全检查
-        if title_prop is None or title_prop.get("type") != "title":
-            return ""
-            
-        title_content = title_prop.get("title", [])
-        if title_content:
-            # 合并所有文本片段
-            full_title = "".join([item["text"]["content"] for item in title_content])
-            return full_title
-        return ""
-       
-    @property
-    def slug(self) -> str:
-        """获取 slug"""
-        slug_prop = self.properties.get("Slug", self.properties.get("slug", {}))
-        if slug_prop.get("type") == "rich_text" and slug_prop.get("rich_text"):
-            # 合并所有文本片段
-            full_slug = "".join([item["text"]["content"] for item in slug_prop["rich_text"]])
-            return full_slug
-        return ""
-    
-    @property
-    def tags(self) -> List[str]:
-        """获取标签（优先使用新的 Tag 属性，兼容旧的 Tags）"""
-        tags_prop = self.properties.get("Tag", self.properties.get("Tags", self.properties.get("tags", {})))
-        if tags_prop.get("type") == "multi_select":
-            return [tag["name"] for tag in tags_prop.get("multi_select", [])]
-        return []
-    
-    @property
-    def status(self) -> str:
-        """获取状态"""
-        status_prop = self.properties.get("Status", self.properties.get("status", {}))
+        # 属性默认值，_parse 会用页面中实际存在的属性覆盖
+        self.title: str = ""
+        self.slug: str = ""
+        self.tags: List[str] = []  # 优先使用新的 Tag 属性，兼容旧的 Tags
+        self.status: str = "Draft"
+        self.excerpt: str = ""
+        self.post_type: str = "Post"  # Post / Page / Project / Projects
+        self.project_status: str = "active"
+        self.technologies: List[str] = []
+        self.project_period: str = ""
+        self.github_url: Optional[str] = None  # 优先使用 URL 属性，兼容 GitHub
+        self.demo_url: Optional[str] = None
+        self.project_category: str = ""
+        self.project_type_name: str = ""  # ProjectType
+        self._date: Optional[str] = None
+        self._description: str = ""
         
-        # 安全检查
-        if status_prop is None or status_prop.get("type") != "select":
-            return "Draft"
-            
-        select_data = status_prop.get("select")
-        if select_data is not None:
-            return select_data.get("name", "Draft")
-        return "Draft"
-    
-    @property
+        self._parse()
+    
+    def _parse(self):
+        """一次遍历 properties，按属性名分派到对应的提取函数"""
+        ranks: Dict[str, int] = {}
+        for name, prop in self.properties.items():
+            entry = _PROPERTY_EXTRACTORS.get(name.lower())
+            if entry is None or not isinstance(prop, dict):
+                continue
+            
+            attr, extract, rank = entry
+            if ranks.get(attr, rank + 1) <= rank:
+                continue
+            
+            value = extract(prop)
+            if value is not None:
+                setattr(self, attr, value)
+                ranks[attr] = rank
+    
+    @cached_property
     def date(self) -> str:
         """获取日期"""
-        date_prop = self.properties.get("Date", self.properties.get("date", {}))
-        if date_prop.get("type") == "date" and date_prop.get("date"):
-            return date_prop["date"]["start"]
-        return self.created_time.split("T")[0]
-    
-    @property
-    def excerpt(self) -> str:
-        """获取摘要"""
-        excerpt_prop = self.properties.get("Excerpt", self.properties.get("excerpt", {}))
-        if excerpt_prop.get("type") == "rich_text" and excerpt_prop.get("rich_text"):
-            # 合并所有文本片段
-            full_excerpt = "".join([item["text"]["content"] for item in excerpt_prop["rich_text"]])
-            return full_excerpt
-        return ""
+        return self._date or self.created_time.split("T")[0]
     
-    @property
+    @cached_property
     def description(self) -> str:
         """获取描述（从 excerpt 或 description 属性）"""
         # 优先使用 excerpt
-        if self.excerpt:
-            return self.excerpt
-            
-        # 尝试从 description 属性获取
-        desc_prop = self.properties.get("Description", self.properties.get("description", {}))
-        if desc_prop.get("type") == "rich_text" and desc_prop.get("rich_text"):
-            return "".join([item["text"]["content"] for item in desc_prop["rich_text"]])
-        
-        return ""
-    
-    @property
-    def post_type(self) -> str:
-        """获取文章类型 (Post 或 Page)"""
-        type_prop = self.properties.get("Type", self.properties.get("type", {}))
-        
-        # 安全检查
-        if type_prop is None:
-            return "Post"
-            
-        if type_prop.get("type") == "select":
-            select_data = type_prop.get("select")
-            if select_data is not None:
-                return select_data.get("name", "Post")
-                
-        return "Post"
+        return self.excerpt or self._description
     
     def is_published(self) -> bool:
         """检查是否为发布状态"""
@@ -132,7 +181,7 @@ class NotionPost:
         """检查是否为页面"""
         return self.post_type == "Page"
 
-    @property
+    @cached_property
     def cover_url(self) -> Optional[str]:
         """Get cover image URL if exists"""
         cover = self.page_data.get("cover")
@@ -145,64 +194,6 @@ class NotionPost:
         elif cover_type == "file":
             return cover.get("file", {}).get("url")
         return None
-
-    @property
-    def project_status(self) -> str:
-        """获取项目状态"""
-        status_prop = self.properties.get("Project Status", self.properties.get("project_status", {}))
-        if status_prop.get("type") == "select":
-            return status_prop.get("select", {}).get("name", "active")
-        return "active"
-    
-    @property
-    def technologies(self) -> List[str]:
-        """获取技术栈"""
-        tech_prop = self.properties.get("Technologies", self.properties.get("technologies", {}))
-        if tech_prop.get("type") == "multi_select":
-            return [tech["name"] for tech in tech_prop.get("multi_select", [])]
-        return []
-    
-    @property
-    def project_period(self) -> str:
-        """获取项目时间"""
-        period_prop = self.properties.get("Period", self.properties.get("period", {}))
-        if period_prop.get("type") == "rich_text" and period_prop.get("rich_text"):
-            return "".join([item["text"]["content"] for item in period_prop["rich_text"]])
-        return ""
-    
-    @property
-    def github_url(self) -> Optional[str]:
-        """获取 GitHub 链接（优先使用 URL 属性，兼容 GitHub）"""
-        github_prop = self.properties.get("URL", self.properties.get("GitHub", self.properties.get("github", {})))
-        if github_prop.get("type") == "url":
-            return github_prop.get("url")
-        return None
-    
-    @property
-    def demo_url(self) -> Optional[str]:
-        """获取 Demo 链接"""
-        demo_prop = self.properties.get("Demo", self.properties.get("demo", {}))
-        if demo_prop.get("type") == "url":
-            return demo_prop.get("url")
-        return None
-    
-    @property
-    def project_category(self) -> str:
-        """获取项目分类"""
-        category_prop = self.properties.get("Category", self.properties.get("category", {}))
-        if category_prop.get("type") == "select":
-            return category_prop.get("select", {}).get("name", "")
-        return ""
-    
-    @property
-    def project_type_name(self) -> str:
-        """获取项目类型 (ProjectType)"""
-        type_prop = self.properties.get("ProjectType", self.properties.get("project_type", {}))
-        if type_prop.get("type") == "select":
-            select_data = type_prop.get("select")
-            if select_data:
-                return select_data.get("name", "")
-        return ""
     
     def is_project(self) -> bool:
         """检查是否为项目页面"""
@@ -212,116 +203,64 @@ class NotionPost:
         """检查是否为项目集合页面"""
         return self.post_type == "Projects"
     
-    @property
+    @cached_property
     def database_id(self) -> Optional[str]:
         """获取页面关联的数据库ID"""
         return self.page_data.get("parent", {}).get("database_id") if self.page_data.get("parent") else None
 
 
-class NotionProject:
+class NotionProject(NotionPost):
     """Notion 项目数据模型 - 使用与Post统一的字段"""
     
     def __init__(self, page_data: Dict[str, Any]):
-        self.page_data = page_data
-        self.id = page_data["id"]
-        self.properties = page_data["properties"]
-        self.created_time = page_data["created_time"]
-        self.last_edited_time = page_data["last_edited_time"]
+        super().__init__(page_data)
+        self._init_project()
+    
+    @classmethod
+    def from_post(cls, post: NotionPost) -> "NotionProject":
+        """从已解析的 NotionPost 构造项目，不再重复解析页面属性"""
+        project = cls.__new__(cls)
+        project.__dict__.update(post.__dict__)
+        project._init_project()
+        return project
+    
+    def _init_project(self):
+        """在通用字段之上设置项目特有的字段"""
+        # 项目的技术栈与 tags 统一
+        self.technologies = self.tags
         
-        # 使用 NotionPost 的实例来复用所有属性获取逻辑
-        self.post = NotionPost(page_data)
-    
-    # === 统一字段 - 直接复用NotionPost的逻辑 ===
-    
-    @property
-    def title(self) -> str:
-        """获取项目标题"""
-        return self.post.title
-    
-    @property
-    def description(self) -> str:
-        """获取项目描述"""
-        return self.post.description
-    
-    @property
-    def status(self) -> str:
-        """获取项目状态"""
-        return self.post.status
-    
-    @property
-    def tags(self) -> List[str]:
-        """获取标签（作为技术栈）"""
-        return self.post.tags
-    
-    @property
-    def technologies(self) -> List[str]:
-        """获取技术栈（与tags统一）"""
-        return self.tags
-    
-    @property
-    def excerpt(self) -> str:
-        """获取摘要"""
-        return self.post.excerpt
-    
-    @property
-    def slug(self) -> str:
-        """获取项目slug"""
-        return self.post.slug or self._generate_slug()
-    
-    @property
-    def date(self) -> str:
-        """获取项目日期"""
-        return self.post.date
-    
-    @property
-    def cover_url(self) -> Optional[str]:
-        """获取封面图片 URL（直接取页面封面）"""
-        return self.post.cover_url
+        # 没有设置 slug 时从标题生成
+        if not self.slug:
+            self.slug = self._generate_slug()
     
     # === 项目特有字段 ===
     
-    @property
-    def github_url(self) -> Optional[str]:
-        """获取 GitHub 链接"""
-        return self.post.github_url
-    
-    @property
-    def demo_url(self) -> Optional[str]:
-        """获取 Demo 链接"""
-        return self.post.demo_url
-    
     @property
     def period(self) -> str:
         """获取项目时间"""
-        return self.post.project_period
+        return self.project_period
     
     @property
     def category(self) -> str:
         """获取项目分类"""
-        return self.post.project_category
+        return self.project_category
 
     @property
     def project_type(self) -> str:
         """获取项目具体类型 (ProjectType)"""
-        return self.post.project_type_name
+        return self.project_type_name
     
     # === 方法 ===
     
     def _generate_slug(self) -> str:
         """从标题生成 slug"""
-        import re
-        slug = re.sub(r'[^\w\s-]', '', self.title.lower())
-        slug = re.sub(r'[-\s]+', '-', slug)
-        return slug.strip('-')
+        slug = _SLUG_STRIP.sub('', self.title.lower())
+        return _SLUG_DASH.sub('-', slug).strip('-')
     
     def is_active(self) -> bool:
         """检查项目是否为活跃状态"""
         return self.status.lower() not in ["draft", "archived"]
     
-    def is_published(self) -> bool:
-        """检查是否为发布状态"""
-        return self.post.is_published()
-    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
@@ -342,6 +281,76 @@ class NotionProject:
         }
 
 
+class NotionAPI:
+    """Notion REST API 的轻量异步封装，只实现同步用到的接口"""
+    
+    # 同时进行的请求数上限。这只限制并发，不限制每秒请求数；
+    # 超出 Notion 约每秒 3 个请求的限流时，由下面的 429 重试兜底
+    MAX_CONCURRENCY = 3
+    # 遇到 429 限流时的最大重试次数
+    MAX_RETRIES = 3
+    
+    def __init__(self, token: str, proxy_url: Optional[str] = None):
+        # 所有请求共用一个连接池
+        self._http = httpx.AsyncClient(
+            base_url="https://api.notion.com",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Notion-Version": "2022-06-28",
+                "Content-Type": "application/json",
+            },
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30.0,
+            proxy=proxy_url,
+        )
+        self._sem = asyncio.Semaphore(self.MAX_CONCURRENCY)
+    
+    async def aclose(self):
+        """关闭 HTTP 客户端"""
+        await self._http.aclose()
+    
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """发送请求并返回 JSON，被限流时按 Retry-After 等待后重试"""
+        for attempt in range(self.MAX_RETRIES + 1):
+            async with self._sem:
+                response = await self._http.request(method, path, **kwargs)
+            if response.status_code != 429 or attempt == self.MAX_RETRIES:
+                break
+            # 在信号量之外等待，不占用并发名额
+            delay = self._retry_delay(response)
+            print(f"Notion API 限流，{delay:g} 秒后重试: {path}")
+            await asyncio.sleep(delay)
+        
+        response.raise_for_status()
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+    
+    @staticmethod
+    def _retry_delay(response: httpx.Response) -> float:
+        """解析 Retry-After 秒数；缺失或不是数字（如 HTTP 日期）时等待 1 秒"""
+        try:
+            return max(float(response.headers.get("Retry-After", 1)), 0.0)
+        except ValueError:
+            return 1.0
+    
+    async def search(self, **body) -> Dict[str, Any]:
+        """POST /v1/search"""
+        return await self._request("POST", "/v1/search", json=body)
+    
+    async def query_database(self, database_id: str, **body) -> Dict[str, Any]:
+        """POST /v1/databases/{database_id}/query"""
+        return await self._request("POST", f"/v1/databases/{database_id}/query", json=body)
+    
+    async def list_children(self, block_id: str, cursor: Optional[str] = None,
+                            page_size: int = 100) -> Dict[str, Any]:
+        """GET /v1/blocks/{block_id}/children，返回一页子 block"""
+        params: Dict[str, Any] = {"page_size": page_size}
+        if cursor:
+            params["start_cursor"] = cursor
+        return await self._request("GET", f"/v1/blocks/{block_id}/children", params=params)
+
+
 class NotionClient:
     """Notion API 客户端封装"""
     
@@ -361,31 +370,96 @@ class NotionClient:
             os.environ.pop('HTTPS_PROXY', None)
             print(f'NotionClient init without proxy')
             
-        self.client = Client(auth=config.token)
+        # 所有接口都走同一个异步客户端，复用连接池且不阻塞事件循环
+        self.api = NotionAPI(config.token, config.proxy_url)
+        
+        # 页面正文的本地缓存，文件名包含 last_edited_time，页面修改后自然失效
+        self._cache_dir = Path.home() / ".cache" / "notion_sync" / "blocks"
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
         print(f'NotionClient initialized successfully')
     
-    def get_posts(self) -> List[NotionPost]:
-        """获取博客文章列表"""
+    async def aclose(self):
+        """关闭 HTTP 客户端"""
+        await self.api.aclose()
+    
+    async def fetch_all_pages(self) -> List[Dict[str, Any]]:
+        """获取集成可见的所有页面（原始数据），文章和项目共用这一次查询"""
+        body = {
+            # 只搜索页面，数据库对象在服务端就被过滤掉
+            "filter": {
+                "property": "object",
+                "value": "page"
+            },
+            "sort": {
+                "timestamp": "last_edited_time",
+                "direction": "descending"
+            },
+            "page_size": 100,
+        }
+        return await self._collect_pages(self.api.search, body)
+    
+    async def fetch_database_projects(self, database_id: str) -> List[Dict[str, Any]]:
+        """查询数据库中 Type 为 Project 的页面（原始数据），优先由服务端完成过滤
+        
+        数据库没有名为 Type 的 select 属性（如列名为 type）时 Notion 返回 400，
+        此时退回不带过滤条件的查询，由调用方在本地用 is_project() 过滤。
+        """
+        query = partial(self.api.query_database, database_id)
+        body = {
+            "filter": {
+                "property": "Type",
+                "select": {"equals": "Project"}
+            },
+            "page_size": 100,
+        }
         try:
-            print("正在从 Notion 获取文章...")
-            
-            # client.search 实际上是同步的！
-            response = self.client.search(
-                sort={
-                    "timestamp": "last_edited_time",
-                    "direction": "descending"
-                }
-            )
-            
-            results = response.get("results", [])
-            
-            # 过滤掉没有标题的文章
-            valid_posts = []
-            for page in results:
+            return await self._collect_pages(query, body)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 400:
+                raise
+            print(f"数据库 {database_id} 不支持按 Type 过滤，改为在本地过滤")
+            return await self._collect_pages(query, {"page_size": 100})
+    
+    async def _collect_pages(self, request, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """按游标翻页，直到取完所有结果"""
+        pages = []
+        while True:
+            response = await request(**body)
+            pages.extend(page for page in response.get("results", []) if page is not None)
+            if not response.get("has_more") or not response.get("next_cursor"):
+                break
+            body["start_cursor"] = response["next_cursor"]
+        
+        return pages
+    
+    def parse_posts(self, pages: List[Dict[str, Any]]) -> List[NotionPost]:
+        """将页面数据转换为文章，过滤掉没有标题的页面"""
+        valid_posts = []
+        for page in pages:
+            try:
                 post = NotionPost(page)
                 # 检查是否有有效标题（不是默认的无标题文章）
                 if post.title and post.title != "·":
                     valid_posts.append(post)
+            except Exception as page_error:
+                print(f"处理页面时出错: {page_error}")
+                continue
+        return valid_posts
+    
+    def parse_projects(self, pages: List[Dict[str, Any]]) -> List[NotionProject]:
+        """从页面数据中挑出项目页面"""
+        return self.projects_from_posts(self.parse_posts(pages))
+    
+    def projects_from_posts(self, posts: List[NotionPost]) -> List[NotionProject]:
+        """从已解析的文章中挑出项目页面，复用解析结果，不再重复解析"""
+        return [NotionProject.from_post(post) for post in posts if post.is_project()]
+    
+    async def get_posts(self) -> List[NotionPost]:
+        """获取博客文章列表"""
+        try:
+            print("正在从 Notion 获取文章...")
+            
+            valid_posts = self.parse_posts(await self.fetch_all_pages())
             
             print(f"找到 {len(valid_posts)} 篇文章")
             return valid_posts
@@ -394,98 +468,82 @@ class NotionClient:
             print(f"获取文章失败: {e}")
             return []
     
-    def get_page_content(self, page_id: str) -> str:
-        """获取页面内容（正文）"""
+    def _content_cache_path(self, page_id: str, last_edited_time: str) -> Path:
+        """页面正文缓存文件路径"""
+        # 时间戳中的冒号在部分文件系统上不合法
+        stamp = last_edited_time.replace(":", "")
+        return self._cache_dir / f"{page_id}-{stamp}.md"
+    
+    def _read_cached_content(self, cache_path: Path) -> Optional[str]:
+        """读取缓存的页面正文，未命中返回 None"""
         try:
-            # 获取页面的 blocks（内容块）
-            blocks = self.client.blocks.children.list(block_id=page_id)
-            
-            # 将 blocks 转换为 Markdown
-            content_parts = []
-            for block in blocks.get("results", []):
-                content_parts.append(self._block_to_markdown(block))
-            
-            return "\n\n".join(content_parts)
-            
-        except Exception as e:
-            print(f"获取页面内容失败: {e}")
-            return ""
+            return cache_path.read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            # 文件不存在或内容损坏（如被截断的多字节字符）都视为未命中，重新获取
+            return None
     
-    def _block_to_markdown(self, block: Dict[str, Any]) -> str:
-        """将 Notion block 转换为 Markdown"""
-        block_type = block.get("type", "")
-        
-        if block_type == "paragraph":
-            text = self._extract_rich_text(block.get("paragraph", {}).get("rich_text", []))
-            return text if text else ""
-        
-        elif block_type == "heading_1":
-            text = self._extract_rich_text(block.get("heading_1", {}).get("rich_text", []))
-            return f"# {text}" if text else ""
-        
-        elif block_type == "heading_2":
-            text = self._extract_rich_text(block.get("heading_2", {}).get("rich_text", []))
-            return f"## {text}" if text else ""
-        
-        elif block_type == "heading_3":
-            text = self._extract_rich_text(block.get("heading_3", {}).get("rich_text", []))
-            return f"### {text}" if text else ""
-        
-        elif block_type == "bulleted_list_item":
-            text = self._extract_rich_text(block.get("bulleted_list_item", {}).get("rich_text", []))
-            return f"- {text}" if text else ""
-        
-        elif block_type == "numbered_list_item":
-            text = self._extract_rich_text(block.get("numbered_list_item", {}).get("rich_text", []))
-            return f"1. {text}" if text else ""
-        
-        elif block_type == "code":
-            text = self._extract_rich_text(block.get("code", {}).get("rich_text", []))
-            language = block.get("code", {}).get("language", "")
-            return f"```{language}\n{text}\n```" if text else ""
+    def _write_cached_content(self, cache_path: Path, page_id: str, content: str):
+        """写入页面正文缓存，并清理该页面的旧版本"""
+        try:
+            for stale in self._cache_dir.glob(f"{page_id}-*.md"):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+            # 先写临时文件再原子替换，进程中途被杀不会留下被截断的缓存
+            tmp_path = cache_path.with_suffix(cache_path.suffix + ".part")
+            try:
+                tmp_path.write_text(content, encoding="utf-8")
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            print(f"写入页面内容缓存失败: {e}")
+    
+    async def get_page_content(self, page_id: str, last_edited_time: Optional[str] = None,
+                               reuse_cached: Optional[Callable[[str], bool]] = None) -> str:
+        """获取页面内容（正文）
         
-        elif block_type == "image":
-            image_url = block.get("image", {}).get("file", {}).get("url", "") or \
-                       block.get("image", {}).get("external", {}).get("url", "")
-            return f"![image]({image_url})" if image_url else ""
+        传入 last_edited_time 时优先读取本地缓存，页面未修改则不再请求 Notion。
+        缓存的正文里 Notion 图片是会过期的签名地址，调用方可以传入 reuse_cached
+        检查缓存内容是否仍然可用，返回 False 时重新从 Notion 获取。
+        获取失败时抛出异常，避免把空内容当作正文写入。
+        """
+        cache_path = None
+        if last_edited_time:
+            cache_path = self._content_cache_path(page_id, last_edited_time)
+            cached = await asyncio.to_thread(self._read_cached_content, cache_path)
+            if cached is not None and (reuse_cached is None or reuse_cached(cached)):
+                return cached
         
-        return ""
-    
-    def _extract_rich_text(self, rich_text: List[Dict[str, Any]]) -> str:
-        """从富文本中提取纯文本"""
-        result = []
-        for text_item in rich_text:
-            content = text_item.get("text", {}).get("content", "")
-            if text_item.get("text", {}).get("link"):
-                url = text_item["text"]["link"]["url"]
-                content = f"[{content}]({url})"
+        try:
+            # 按游标翻页获取页面的所有 blocks（内容块）
+            blocks = []
+            cursor = None
+            while True:
+                data = await self.api.list_children(page_id, cursor)
+                blocks.extend(data.get("results", []))
+                if not data.get("has_more") or not data.get("next_cursor"):
+                    break
+                cursor = data["next_cursor"]
             
-            # 处理格式
-            if text_item.get("annotations", {}).get("bold"):
-                content = f"**{content}**"
-            if text_item.get("annotations", {}).get("italic"):
-                content = f"*{content}*"
-            if text_item.get("annotations", {}).get("strikethrough"):
-                content = f"~~{content}~~"
-            if text_item.get("annotations", {}).get("code"):
-                content = f"`{content}`"
+            # 将 blocks 转换为 Markdown
+            content = blocks_to_markdown(blocks)
+            if cache_path is not None:
+                await asyncio.to_thread(self._write_cached_content, cache_path, page_id, content)
+            return content
             
-            result.append(content)
-        
-        return "".join(result)
+        except Exception as e:
+            print(f"获取页面内容失败: {e}")
+            raise
     
-    def get_database_pages(self, database_id: str) -> List[NotionPost]:
-        """获取数据库中的所有页面（简化版本，通过搜索过滤）"""
+    async def get_database_pages(self, database_id: str) -> List[NotionPost]:
+        """获取数据库中的所有项目页面"""
         try:
             print(f"正在从数据库 {database_id} 获取项目...")
             
-            # 获取所有页面，然后过滤
-            all_posts = self.get_posts()
-            db_posts = []
-            
-            for post in all_posts:
-                if post.database_id == database_id and post.is_project():
-                    db_posts.append(post)
+            # 直接查询数据库，只返回项目页面
+            pages = await self.fetch_database_projects(database_id)
+            db_posts = [post for post in self.parse_posts(pages) if post.is_project()]
             
             print(f"从数据库中找到 {len(db_posts)} 个项目")
             return db_posts
@@ -494,47 +552,19 @@ class NotionClient:
             print(f"获取数据库内容失败: {e}")
             return []
     
-    def get_projects(self) -> List[NotionProject]:
+    async def get_projects(self) -> List[NotionProject]:
         """获取所有项目"""
         try:
             print("正在从 Notion 获取项目...")
             
             # 获取所有页面
-            response = self.client.search(
-                sort={
-                    "timestamp": "last_edited_time",
-                    "direction": "descending"
-                }
-            )
-            
-            # 检查响应是否有效
-            if response is None:
-                print("Notion API 返回了 None 响应")
-                return []
-            
-            results = response.get("results", [])
-            
-            if not results:
+            pages = await self.fetch_all_pages()
+            if not pages:
                 print("没有找到任何页面")
                 return []
             
             # 过滤项目
-            projects = []
-            for page in results:
-                try:
-                    # 检查page是否有效
-                    if page is None:
-                        continue
-                    
-                    post = NotionPost(page)
-                    
-                    # 检查是否为项目页面
-                    if post.is_project() and post.title and post.title != "·":
-                        projects.append(NotionProject(page))
-                        
-                except Exception as page_error:
-                    print(f"处理页面时出错: {page_error}")
-                    continue
+            projects = self.parse_projects(pages)
             
             print(f"找到 {len(projects)} 个项目")
             return projects
@@ -543,18 +573,14 @@ class NotionClient:
             print(f"获取项目失败: {e}")
             return []
     
-    def get_projects_from_database(self, database_id: str) -> List[NotionProject]:
+    async def get_projects_from_database(self, database_id: str) -> List[NotionProject]:
         """从指定数据库获取项目"""
         try:
             print(f"正在从数据库 {database_id} 获取项目...")
             
-            # 获取所有页面，然后过滤
-            all_projects = self.get_projects()
-            db_projects = []
-            
-            for project in all_projects:
-                if project.post.database_id == database_id:
-                    db_projects.append(project)
+            # 直接查询数据库，只返回项目页面
+            pages = await self.fetch_database_projects(database_id)
+            db_projects = self.parse_projects(pages)
             
             print(f"从数据库中找到 {len(db_projects)} 个项目")
             return db_projects
@@ -3,6 +3,7 @@
 Simple sync test without async issues
 """
 
+import asyncio
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -28,7 +29,7 @@ def simple_sync_test():
         
         # Test get_posts
         print("[INFO] Testing get_posts()...")
-        posts = client.get_posts()
+        posts = asyncio.run(client.get_posts())
         print(f"[SUCCESS] Found {len(posts)} posts")
         
         # Find project posts
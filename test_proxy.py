@@ -29,7 +29,7 @@ async def test_proxy():
         
         # Test get_posts
         print("\n1. Testing get_posts() with proxy...")
-        posts = client.get_posts()  # Now it's synchronous
+        posts = await client.get_posts()
         print(f"[OK] get_posts() returned {len(posts)} posts")
         
         if len(posts) > 0:
@@ -48,5 +48,5 @@ async def test_proxy():
 
 if __name__ == "__main__":
     print("[INFO] Testing Notion connection with proxy support...")
-    success = test_proxy()  # Now it's synchronous
+    success = asyncio.run(test_proxy())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+HugoGenerator 增量同步与图片清理的回归测试
+"""
+
+import asyncio
+
+import pytest
+
+from notion_sync.config import HugoConfig
+from notion_sync.hugo_generator import HugoGenerator
+from notion_sync.notion_client import NotionPost
+
+
+OLD_TIME = "2024-01-01T00:00:00.000Z"
+NEW_TIME = "2024-02-01T00:00:00.000Z"
+
+
+def make_post(page_id: str, slug: str, last_edited_time: str) -> NotionPost:
+    """构造最小的 Notion 页面数据"""
+    return NotionPost({
+        "id": page_id,
+        "created_time": OLD_TIME,
+        "last_edited_time": last_edited_time,
+        "properties": {
+            "Title": {"type": "title", "title": [{"text": {"content": slug}}]},
+            "Slug": {"type": "rich_text", "rich_text": [{"text": {"content": slug}}]},
+            "Status": {"type": "select", "select": {"name": "Published"}},
+        },
+    })
+
+
+def write_post(path, page_id: str, last_edited_time: str, body: str, cover: str = ""):
+    """写入一个之前同步生成的文章文件"""
+    cover_line = f"image: {cover}\n" if cover else ""
+    path.write_text(
+        f"---\nnotion_id: {page_id}\nlast_edited_time: '{last_edited_time}'\n{cover_line}---\n\n{body}\n",
+        encoding="utf-8",
+    )
+
+
+class FakeNotionClient:
+    """只实现 get_page_content，指定的页面获取失败"""
+
+    def __init__(self, failing_ids):
+        self.failing_ids = set(failing_ids)
+
+    async def get_page_content(self, page_id, last_edited_time=None, reuse_cached=None):
+        if page_id in self.failing_ids:
+            raise RuntimeError("Notion 500")
+        # 图片已下载过（按文件 ID 命中本地索引），不会发起网络请求
+        return "![x](https://file.notion.so/f/55555555abcd/x.png?exp=1)"
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    config = HugoConfig(
+        content_dir=tmp_path / "content" / "posts",
+        pages_dir=tmp_path / "content",
+        static_dir=tmp_path / "static",
+        images_dir=tmp_path / "static" / "images",
+    )
+    config.images_dir.mkdir(parents=True)
+    yield config
+
+
+def test_clean_keeps_images_of_files_that_were_not_regenerated(config):
+    posts_dir = config.content_dir
+    posts_dir.mkdir(parents=True)
+    images_dir = config.images_dir
+    for name in ("alpha-11111111.png", "alpha-aaaaaaaa.jpg", "beta-22222222.png",
+                 "gamma-33333333.png", "delta-55555555.png", "orphan-44444444.png"):
+        (images_dir / name).write_bytes(b"img")
+
+    # alpha 未变化，封面只出现在前置数据中
+    write_post(posts_dir / "alpha.md", "a", OLD_TIME,
+               "![x](/images/alpha-11111111.png)", cover="/images/alpha-aaaaaaaa.jpg")
+    # beta 在 Notion 中已修改，但重新获取正文失败，旧文件留在磁盘上
+    write_post(posts_dir / "beta.md", "b", OLD_TIME, "![x](/images/beta-22222222.png)")
+    # gamma 的前置数据无法解析
+    (posts_dir / "gamma.md").write_text(
+        "---\nnotion_id: [unclosed\n---\n\n![x](/images/gamma-33333333.png)\n", encoding="utf-8"
+    )
+
+    # 图片放好之后再创建生成器，启动时的图片索引才能看到它们
+    generator = HugoGenerator(config)
+    posts = [
+        make_post("a", "alpha", OLD_TIME),
+        make_post("b", "beta", NEW_TIME),
+        make_post("d", "delta", NEW_TIME),
+    ]
+    to_write, to_delete = generator.plan_changes(posts, [])
+    assert to_write == {"b", "d"}
+    assert to_delete == []
+
+    changed = [post for post in posts if post.id in to_write]
+
+    async def run():
+        try:
+            generated = await generator.generate_posts(changed, FakeNotionClient({"b"}))
+            generator.clean_unused_images()
+            return generated
+        finally:
+            await generator.close()
+
+    assert asyncio.run(run()) == 1
+    assert "/images/delta-55555555.png" in (posts_dir / "delta.md").read_text(encoding="utf-8")
+
+    remaining = {path.name for path in images_dir.iterdir() if path.is_file()}
+    assert {"alpha-11111111.png", "alpha-aaaaaaaa.jpg", "beta-22222222.png",
+            "gamma-33333333.png", "delta-55555555.png"} <= remaining
+    assert "orphan-44444444.png" not in remaining
+
+
+def test_plan_changes_deletes_orphans_and_skips_hand_written_pages(config):
+    posts_dir = config.content_dir
+    posts_dir.mkdir(parents=True)
+    write_post(posts_dir / "gone.md", "z", OLD_TIME, "old")
+    (config.pages_dir / "search.md").write_text("---\ntitle: 搜索\n---\n", encoding="utf-8")
+
+    generator = HugoGenerator(config)
+    try:
+        to_write, to_delete = generator.plan_changes([make_post("a", "alpha", OLD_TIME)], [])
+    finally:
+        asyncio.run(generator.close())
+
+    assert to_write == {"a"}
+    assert to_delete == [posts_dir / "gone.md"]
+
+
+def test_image_manifest_lives_outside_static_and_legacy_file_is_migrated(config, tmp_path):
+    legacy = config.images_dir / ".cache.json"
+    legacy.write_text('{"https://example.com/a.png": {"filename": "a-12345678.png"}}', encoding="utf-8")
+
+    generator = HugoGenerator(config)
+    try:
+        assert not generator._img_cache_path.is_relative_to(config.static_dir)
+        assert generator._img_cache_path.is_relative_to(tmp_path / "home" / ".cache" / "notion_sync")
+        assert "https://example.com/a.png" in generator._img_cache
+    finally:
+        asyncio.run(generator.close())
+
+    # 旧文件已从发布目录移走，写回的缓存也不在 static 下
+    assert not legacy.exists()
+    assert not list(config.static_dir.rglob("*.json"))
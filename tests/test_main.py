@@ -0,0 +1,52 @@
+"""
+BlogSyncer 同步流程的回归测试
+"""
+
+import asyncio
+
+import pytest
+
+from notion_sync.config import HugoConfig, NotionConfig, SyncConfig
+from notion_sync.main import BlogSyncer
+
+
+@pytest.fixture
+def syncer(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv("HTTP_PROXY", raising=False)
+    monkeypatch.delenv("HTTPS_PROXY", raising=False)
+    config = SyncConfig(
+        notion=NotionConfig(token="secret", database_id="db"),
+        hugo=HugoConfig(
+            content_dir=tmp_path / "content" / "posts",
+            pages_dir=tmp_path / "content",
+            static_dir=tmp_path / "static",
+            images_dir=tmp_path / "static" / "images",
+        ),
+    )
+    return BlogSyncer(config)
+
+
+def test_force_sync_reports_clean_error_when_fetch_fails(syncer, monkeypatch, capsys):
+    async def fetch_fails():
+        raise RuntimeError("Notion 不可用")
+
+    def reset_fails(directory):
+        raise PermissionError(f"无法删除 {directory}")
+
+    monkeypatch.setattr(syncer.notion_client, "fetch_all_pages", fetch_fails)
+    monkeypatch.setattr(syncer, "_reset_dir", reset_fails)
+
+    async def run():
+        try:
+            return await syncer.sync(force=True)
+        finally:
+            await syncer.notion_client.aclose()
+            await syncer.hugo_generator.close()
+
+    assert asyncio.run(run()) is False
+
+    output = capsys.readouterr().out
+    assert "同步失败: Notion 不可用" in output
+    # 后台清理的异常被取回并报告，而不是变成 "Task exception was never retrieved"
+    assert "清理生成目录失败" in output
@@ -0,0 +1,93 @@
+"""
+NotionClient 页面正文缓存和页面解析的回归测试
+"""
+
+import asyncio
+
+import pytest
+
+from notion_sync.config import NotionConfig
+from notion_sync.notion_client import NotionClient, NotionPost, NotionProject
+
+
+EDITED = "2024-02-01T00:00:00.000Z"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("HTTP_PROXY", raising=False)
+    monkeypatch.delenv("HTTPS_PROXY", raising=False)
+    client = NotionClient(NotionConfig(token="secret", database_id="db"))
+
+    async def list_children(block_id, cursor=None, page_size=100):
+        return {
+            "results": [{"type": "paragraph", "paragraph": {"rich_text": [{"text": {"content": "中文"}}]}}],
+            "has_more": False,
+        }
+
+    # 不访问网络，直接返回一个段落
+    monkeypatch.setattr(client.api, "list_children", list_children)
+    yield client
+    asyncio.run(client.aclose())
+
+
+def test_truncated_cache_entry_is_treated_as_miss(client):
+    cache_path = client._content_cache_path("page", EDITED)
+    # "中文" 的 UTF-8 编码截断在多字节字符中间
+    cache_path.write_bytes("中文".encode("utf-8")[:4])
+
+    content = asyncio.run(client.get_page_content("page", EDITED))
+
+    assert content == "中文"
+    assert cache_path.read_text(encoding="utf-8") == "中文"
+    assert not list(cache_path.parent.glob("*.part"))
+
+
+def test_cache_hit_skips_fetch(client, monkeypatch):
+    client._content_cache_path("page", EDITED).write_text("cached", encoding="utf-8")
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("不应请求 Notion")
+
+    monkeypatch.setattr(client.api, "list_children", fail)
+    assert asyncio.run(client.get_page_content("page", EDITED)) == "cached"
+
+
+def test_projects_reuse_parsed_posts(client, monkeypatch):
+    pages = [
+        {
+            "id": "p1",
+            "created_time": EDITED,
+            "last_edited_time": EDITED,
+            "properties": {
+                "Title": {"type": "title", "title": [{"text": {"content": "My Tool"}}]},
+                "Type": {"type": "select", "select": {"name": "Project"}},
+                "Tags": {"type": "multi_select", "multi_select": [{"name": "Python"}]},
+            },
+        },
+        {
+            "id": "p2",
+            "created_time": EDITED,
+            "last_edited_time": EDITED,
+            "properties": {
+                "Title": {"type": "title", "title": [{"text": {"content": "A post"}}]},
+            },
+        },
+    ]
+    posts = client.parse_posts(pages)
+    expected = NotionProject(pages[0])
+
+    # 之后不应再解析页面属性
+    def no_reparse(self):
+        raise AssertionError("页面被重复解析")
+
+    monkeypatch.setattr(NotionPost, "_parse", no_reparse)
+    projects = client.projects_from_posts(posts)
+
+    assert [project.id for project in projects] == ["p1"]
+    assert isinstance(projects[0], NotionProject)
+    assert projects[0].slug == expected.slug == "my-tool"
+    assert projects[0].technologies == ["Python"]
+    # 文章本身不受影响
+    assert posts[0].slug == ""